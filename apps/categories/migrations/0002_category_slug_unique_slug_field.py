@@ -0,0 +1,22 @@
+# Generated by Django 6.0.1 on 2026-10-18 03:46
+
+from django.db import migrations
+
+import common.slugs
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("categories", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="category",
+            name="slug",
+            field=common.slugs.UniqueSlugField(
+                editable=False, populate_from="name", unique=True
+            ),
+        ),
+    ]
@@ -1,13 +1,13 @@
 from typing import ClassVar, Self
 
-from autoslug import AutoSlugField
-
 from django.db.models import CharField, Manager, Model
 
+from common.slugs import UniqueSlugField, UniqueSlugMixin
+
 
-class Category(Model):
+class Category(UniqueSlugMixin, Model):
     name = CharField(max_length=100, null=False)
-    slug = AutoSlugField(populate_from="name", unique=True, null=False)
+    slug = UniqueSlugField(populate_from="name", unique=True, null=False)
 
     class Meta:
         db_table = "categories"
@@ -1,20 +1,57 @@
 import json
+import os
+import socket
 from logging import getLogger
-from typing import Any
+from typing import Any, cast
 
-from django.core.management.base import BaseCommand
+from redis.exceptions import ResponseError
 
-from settings.conf import Channels, pubsub
+from django.core.management.base import BaseCommand, CommandParser
+
+from apps.comments.outbox import get_stream_key
+from settings.conf import Channels, pubsub, redis_client, settings
 
 logger = getLogger(__name__)
 
+Entry = tuple[bytes, dict[bytes, bytes]]
+
 
 class Command(BaseCommand):
     help = (
         "Subscribe to Redis comments channel and print incoming comments in real-time"
     )
 
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--group",
+            default="listen_comments",
+            help="Consumer group, listeners in one group share the stream",
+        )
+        parser.add_argument(
+            "--consumer",
+            default=f"{socket.gethostname()}-{os.getpid()}",
+            help=(
+                "Consumer name, unique within the group. Defaults to "
+                "<hostname>-<pid>, pass a stable name to replay this listener's "
+                "unacknowledged events after a restart, otherwise they're "
+                "claimed by another consumer after --claim-idle-ms"
+            ),
+        )
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--claim-idle-ms",
+            type=int,
+            default=60_000,
+            help="Take over events left unacknowledged this long by other consumers",
+        )
+
     def handle(self, *args: Any, **options: Any):
+        if settings.outbox.transport == "stream":
+            self.listen_stream(**options)
+        else:
+            self.listen_channel()
+
+    def listen_channel(self) -> None:
         pubsub.subscribe(Channels.COMMENTS)
 
         print("Started listening comments...")
@@ -25,3 +62,112 @@ class Command(BaseCommand):
             ):
                 comment_data = json.loads(message["data"])
                 print(comment_data)
+
+    def listen_stream(
+        self,
+        group: str,
+        consumer: str,
+        batch_size: int,
+        claim_idle_ms: int,
+        **options: Any,
+    ) -> None:
+        stream = get_stream_key(Channels.COMMENTS)
+        self._create_group(stream, group)
+
+        print(f"Started consuming {stream} as {group}/{consumer}...")
+        self._replay(stream, group, consumer, batch_size)
+
+        # Each pass claims from where the previous one stopped, the reply's
+        # cursor is 0-0 again once the whole pending list was scanned
+        claim_cursor: bytes | str = "0-0"
+
+        while True:
+            claim_cursor = self._poll(
+                stream,
+                group,
+                consumer,
+                batch_size,
+                claim_idle_ms,
+                claim_cursor,
+                block=5000,
+            )
+
+    def _create_group(self, stream: str, group: str) -> None:
+        try:
+            redis_client.xgroup_create(stream, group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def _replay(self, stream: str, group: str, consumer: str, batch_size: int) -> None:
+        # Events delivered to this consumer before a restart but never acked
+        while entries := self._read(stream, group, consumer, batch_size, "0"):
+            self._process(stream, group, entries)
+
+    def _poll(
+        self,
+        stream: str,
+        group: str,
+        consumer: str,
+        batch_size: int,
+        claim_idle_ms: int,
+        claim_cursor: bytes | str,
+        block: int | None = None,
+    ) -> bytes | str:
+        """Claims stale events, then reads new ones. Returns the claim cursor."""
+        # Redis 7 appends the IDs of deleted entries, 6.2 replies with two
+        reply = cast(
+            list[Any],
+            redis_client.xautoclaim(
+                stream,
+                group,
+                consumer,
+                claim_idle_ms,
+                start_id=claim_cursor,
+                count=batch_size,
+            ),
+        )
+        claim_cursor, claimed = reply[0], reply[1]
+
+        if claimed:
+            logger.info("Claimed %d stale events", len(claimed))
+            self._process(stream, group, claimed)
+
+        self._process(
+            stream,
+            group,
+            self._read(stream, group, consumer, batch_size, ">", block=block),
+        )
+
+        return claim_cursor
+
+    def _read(
+        self,
+        stream: str,
+        group: str,
+        consumer: str,
+        count: int,
+        last_id: str,
+        block: int | None = None,
+    ) -> list[Entry]:
+        # RESP2 reply, one [stream, entries] pair per stream read
+        response = cast(
+            list[tuple[bytes, list[Entry]]],
+            redis_client.xreadgroup(
+                group, consumer, {stream: last_id}, count=count, block=block
+            ),
+        )
+        return response[0][1] if response else []
+
+    def _process(self, stream: str, group: str, entries: list[Entry]) -> None:
+        ids = []
+
+        for entry_id, fields in entries:
+            ids.append(entry_id)
+
+            # Entries trimmed by MAXLEN while pending come back without fields
+            if fields:
+                print(json.loads(fields[b"payload"]))
+
+        if ids:
+            redis_client.xack(stream, group, *ids)
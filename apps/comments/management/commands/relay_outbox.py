@@ -0,0 +1,47 @@
+import time
+from logging import getLogger
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import close_old_connections
+
+from apps.comments.outbox import relay_batch
+from settings.conf import settings
+
+logger = getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Publish outbox events to Redis in order, retrying on failures"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.outbox.batch_size
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="Exit once the outbox is empty"
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        retry_delay = settings.outbox.poll_interval
+        relayed = 0
+
+        while True:
+            try:
+                count = relay_batch(options["batch_size"])
+            except Exception:
+                logger.exception("Outbox relay failed, retrying in %.1fs", retry_delay)
+                close_old_connections()
+                time.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, settings.outbox.max_retry_delay)
+                continue
+
+            retry_delay = settings.outbox.poll_interval
+            relayed += count
+
+            if count < options["batch_size"]:
+                if options["once"]:
+                    break
+                time.sleep(settings.outbox.poll_interval)
+
+        self.stdout.write(f"Relayed {relayed} events")
@@ -0,0 +1,29 @@
+# Generated by Django 6.0.1 on 2026-10-18 03:48
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("comments", "0002_comment_comments_post_created_id_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OutboxEvent",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("channel", models.CharField(max_length=100)),
+                ("payload", models.TextField()),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("attempts", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "outbox event",
+                "verbose_name_plural": "outbox events",
+                "db_table": "comments_outbox",
+            },
+        ),
+    ]
@@ -1,17 +1,24 @@
 from typing import ClassVar, Self
+from uuid import UUID
 
 from django.db.models import (
     CASCADE,
+    BigAutoField,
+    CharField,
     DateTimeField,
     ForeignKey,
+    Index,
     Manager,
     Model,
+    PositiveIntegerField,
     TextField,
 )
 from django.utils import timezone
 
 
 class Comment(Model):
+    post_id: int
+    author_id: UUID
     post = ForeignKey("posts.Post", on_delete=CASCADE)
     author = ForeignKey("users.User", on_delete=CASCADE)
     body = TextField()
@@ -21,5 +28,33 @@ class Comment(Model):
         db_table = "comments"
         verbose_name = "comment"
         verbose_name_plural = "comments"
+        indexes = [
+            Index(
+                fields=["post", "created_at", "id"],
+                name="comments_post_created_id_idx",
+            ),
+        ]
+
+    objects: ClassVar[Manager[Self]]
+
+
+class OutboxEvent(Model):
+    """
+    Event waiting to be published to Redis, see ``relay_outbox``.
+
+    Written in the transaction of the change it describes, so rolled-back
+    changes are never published. Relayed in ``id`` order.
+    """
+
+    id = BigAutoField(primary_key=True)
+    channel = CharField(max_length=100)
+    payload = TextField()
+    created_at = DateTimeField(default=timezone.now)
+    attempts = PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "comments_outbox"
+        verbose_name = "outbox event"
+        verbose_name_plural = "outbox events"
 
     objects: ClassVar[Manager[Self]]
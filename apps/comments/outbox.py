@@ -0,0 +1,67 @@
+from logging import getLogger
+
+from django.db import transaction
+from django.db.models import F
+
+from settings.conf import redis_client, settings
+
+from .models import OutboxEvent
+
+logger = getLogger(__name__)
+
+
+def get_stream_key(channel: str) -> str:
+    return f"{channel}.stream"
+
+
+def relay_batch(batch_size: int) -> int:
+    """
+    Publishes the oldest outbox events in one pipeline and deletes them.
+
+    With the ``stream`` transport events are also appended to a capped Redis
+    Stream, which consumer groups read durably, see ``listen_comments``.
+
+    The rows stay locked until the batch is published, so concurrent relays
+    wait for each other and events go out in ``id`` order. If publishing
+    fails the batch is kept and retried as a whole, so consumers may see an
+    event twice.
+
+    :raises redis.RedisError: If the batch couldn't be published
+    """
+    ids: list[int] = []
+
+    try:
+        with transaction.atomic():
+            events = list(
+                OutboxEvent.objects.select_for_update().order_by("id")[:batch_size]
+            )
+            ids = [i.id for i in events]
+
+            with redis_client.pipeline(transaction=False) as pipe:
+                for event in events:
+                    pipe.publish(event.channel, event.payload)
+
+                    if settings.outbox.transport == "stream":
+                        pipe.xadd(
+                            get_stream_key(event.channel),
+                            {"payload": event.payload},
+                            maxlen=settings.outbox.stream_max_length,
+                            approximate=True,
+                        )
+                pipe.execute()
+
+            OutboxEvent.objects.filter(id__in=ids).delete()
+
+    except Exception:
+        try:
+            # Outside the rolled back transaction, so the attempt is recorded
+            OutboxEvent.objects.filter(id__in=ids).update(attempts=F("attempts") + 1)
+        except Exception:
+            # E.g. the database is down too, the original error matters more
+            logger.exception("Failed to count the outbox attempt, ids: %s", ids)
+        raise
+
+    if ids:
+        logger.debug("Relayed %d outbox events, last id %d", len(ids), ids[-1])
+
+    return len(ids)
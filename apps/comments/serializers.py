@@ -1,5 +1,7 @@
 from rest_framework.serializers import ModelSerializer
 
+from common.serializers import ValuesSerializer
+
 from .models import Comment
 
 
@@ -13,3 +15,6 @@ class CommentCreateSerializer(ModelSerializer):
     class Meta:
         model = Comment
         fields = ("body",)
+
+
+comment_values_serializer = ValuesSerializer(CommentRetrieveSerializer)
@@ -1,14 +1,39 @@
+from django.db import transaction
+from django.db.models import F
+
 from apps.comments.models import Comment
+from apps.posts.models import Post
 from apps.users.models import User
 from common.exceptions import PermissionException
 
 
 class CommentService:
+    @staticmethod
+    def create_comment(post: Post, author: User, body: str) -> Comment:
+        """Adds a comment and bumps ``post.comment_count`` in one transaction."""
+        with transaction.atomic():
+            comment = Comment.objects.create(post=post, author=author, body=body)
+            Post.objects.filter(pk=post.pk).update(comment_count=F("comment_count") + 1)
+
+        return comment
+
+    @staticmethod
+    def delete_comment(comment: Comment) -> None:
+        """Deletes a comment and decrements ``post.comment_count`` atomically."""
+        with transaction.atomic():
+            deleted, _ = Comment.objects.filter(pk=comment.pk).delete()
+
+            # A concurrent delete of the same comment must not count twice
+            if deleted:
+                Post.objects.filter(pk=comment.post_id, comment_count__gt=0).update(
+                    comment_count=F("comment_count") - 1
+                )
+
     @staticmethod
     def check_permission_to_delete(user: User, comment: Comment) -> None:
         """:raises PermissionException:"""
 
-        if not (user == comment.author):
+        if comment.author_id != user.pk:
             raise PermissionException(
                 f"User {user.email} doesn't have permissions to delete this comment"
             )
@@ -17,7 +42,7 @@ class CommentService:
     def check_permission_to_update(user: User, comment: Comment) -> None:
         """:raises PermissionException:"""
 
-        if not (user == comment.author):
+        if comment.author_id != user.pk:
             raise PermissionException(
                 f"User {user.email} doesn't have permissions to update this comment"
             )
@@ -6,9 +6,9 @@ from django.core.serializers.json import DjangoJSONEncoder
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
-from settings.conf import Channels, redis_client
+from settings.conf import Channels
 
-from .models import Comment
+from .models import Comment, OutboxEvent
 from .serializers import CommentRetrieveSerializer
 
 logger = getLogger(__name__)
@@ -20,7 +20,9 @@ def comment_created_handler(
 ):
     if created:
         serializer = CommentRetrieveSerializer(instance)
-        redis_client.publish(
-            Channels.COMMENTS, json.dumps(serializer.data, cls=DjangoJSONEncoder)
+        # Published by relay_outbox once this transaction commits
+        OutboxEvent.objects.create(
+            channel=Channels.COMMENTS,
+            payload=json.dumps(serializer.data, cls=DjangoJSONEncoder),
         )
-        logger.debug("Comment published to the channel: %s", Channels.COMMENTS)
+        logger.debug("Comment queued for the channel: %s", Channels.COMMENTS)
@@ -0,0 +1,100 @@
+import asyncio
+import json
+from logging import getLogger
+from typing import Any
+from weakref import WeakKeyDictionary
+
+import redis.asyncio as aioredis
+
+from settings.conf import Channels, settings
+
+logger = getLogger(__name__)
+
+
+class CommentBroadcaster:
+    """
+    Fans comment events out to per-post subscriber queues.
+
+    One Redis subscription per event loop serves every open stream, it's
+    opened with the first stream and kept for the life of the loop. A
+    subscriber that falls ``settings.streams.queue_size`` events behind is
+    disconnected rather than buffered without bound.
+    """
+
+    def __init__(self) -> None:
+        self.subscribers: dict[int, set[asyncio.Queue[dict[str, Any] | None]]] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    def subscribe(self, post_id: int) -> asyncio.Queue[dict[str, Any] | None]:
+        queue: asyncio.Queue[dict[str, Any] | None] = asyncio.Queue(
+            maxsize=settings.streams.queue_size
+        )
+        self.subscribers.setdefault(post_id, set()).add(queue)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._listen())
+
+        return queue
+
+    def unsubscribe(self, post_id: int, queue: asyncio.Queue) -> None:
+        queues = self.subscribers.get(post_id, set())
+        queues.discard(queue)
+
+        if not queues:
+            self.subscribers.pop(post_id, None)
+
+    def publish(self, event: dict[str, Any]) -> None:
+        post_id: int = event["post_id"]
+
+        for queue in list(self.subscribers.get(post_id, ())):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                logger.warning("Slow comment stream dropped, post_id: %s", post_id)
+                self.unsubscribe(post_id, queue)
+                # Room for the sentinel, the stream ends after what it has
+                queue.get_nowait()
+                queue.put_nowait(None)
+
+    async def _listen(self) -> None:
+        client = aioredis.Redis(
+            host=settings.redis.host,
+            port=settings.redis.port,
+            password=settings.redis.password,
+        )
+        backoff = 0.5
+
+        try:
+            while True:
+                try:
+                    async with client.pubsub(ignore_subscribe_messages=True) as pubsub:
+                        await pubsub.subscribe(Channels.COMMENTS)
+                        backoff = 0.5
+
+                        while True:
+                            message = await pubsub.get_message(timeout=1.0)
+                            if message is not None:
+                                self.publish(json.loads(message["data"]))
+
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logger.exception("Comment stream subscription lost")
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, 30)
+        finally:
+            await client.aclose()
+
+
+_broadcasters: WeakKeyDictionary[asyncio.AbstractEventLoop, CommentBroadcaster] = (
+    WeakKeyDictionary()
+)
+
+
+def get_broadcaster() -> CommentBroadcaster:
+    loop = asyncio.get_running_loop()
+
+    if loop not in _broadcasters:
+        _broadcasters[loop] = CommentBroadcaster()
+
+    return _broadcasters[loop]
@@ -1 +1,383 @@
-# Create your tests here.
+import ast
+import contextlib
+import io
+import json
+import os
+import socket
+import uuid
+from datetime import timedelta
+from typing import Any, Callable
+from unittest import mock
+
+from redis.exceptions import RedisError
+
+from django.core.cache import cache
+from django.db import DatabaseError, connection, transaction
+from django.db.models import QuerySet
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from apps.categories.models import Category
+from apps.posts.enums import StatusEnum
+from apps.posts.models import Post
+from apps.users.models import User
+from common.testing import assert_max_queries
+from settings.conf import Channels, redis_client
+
+from .management.commands.listen_comments import Command as ListenCommentsCommand
+from .models import Comment, OutboxEvent
+from .outbox import relay_batch
+from .serializers import CommentRetrieveSerializer, comment_values_serializer
+
+
+def create_user(email: str) -> User:
+    return User.objects.create_user(
+        email=email, first_name="Test", last_name="User", raw_password="Correct-Horse-9"
+    )
+
+
+def create_post(author: User, category: Category | None = None) -> Post:
+    return Post.objects.create(
+        author=author,
+        title="Post",
+        body="Body",
+        status=StatusEnum.PUBLISHED,
+        category=category,
+    )
+
+
+class CommentValuesSerializerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        author = create_user("author@example.com")
+        post = create_post(author)
+        Comment.objects.create(post=post, author=author, body="First")
+        Comment.objects.create(post=post, author=author, body="<b>Second</b>")
+
+    def test_renders_the_same_json_as_the_model_serializer(self) -> None:
+        comments = Comment.objects.order_by("id")
+        rows = comment_values_serializer.values(comments)
+
+        self.assertEqual(
+            JSONRenderer().render(comment_values_serializer.many(rows)),
+            JSONRenderer().render(CommentRetrieveSerializer(comments, many=True).data),
+        )
+
+
+class CommentCacheInvalidationTests(APITestCase):
+    author: User
+    news: Category
+    sport: Category
+    commented: Post
+    other: Post
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.author = create_user("author@example.com")
+        cls.news = Category.objects.create(name="News")
+        cls.sport = Category.objects.create(name="Sport")
+        cls.commented = create_post(cls.author, cls.news)
+        cls.other = create_post(cls.author, cls.sport)
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def get_posts(self, category: Category) -> tuple[list[dict], int]:
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get("/api/posts/", {"category": str(category.pk)})
+
+        self.assertEqual(response.status_code, 200)
+        return response.json()["results"], len(context)
+
+    def add_comment(self, post: Post) -> None:
+        self.client.force_authenticate(self.author)
+        response = self.client.post(
+            f"/api/posts/{post.slug}/comments/", {"body": "Comment"}, format="json"
+        )
+        self.client.force_authenticate(None)
+
+        self.assertEqual(response.status_code, 201, response.content)
+
+    def test_drops_only_the_pages_listing_the_post(self) -> None:
+        self.get_posts(self.news)
+        self.get_posts(self.sport)
+
+        self.add_comment(self.commented)
+
+        posts, queries = self.get_posts(self.news)
+        self.assertEqual(posts[0]["comment_count"], 1)
+        self.assertGreater(queries, 0)
+
+        _, queries = self.get_posts(self.sport)
+        self.assertEqual(queries, 0)
+
+    def test_drops_the_post_detail_and_comment_list(self) -> None:
+        detail_url = f"/api/posts/{self.commented.slug}/"
+        comments_url = f"/api/posts/{self.commented.slug}/comments/"
+        self.client.get(detail_url)
+        self.client.get(comments_url)
+
+        self.add_comment(self.commented)
+
+        self.assertEqual(self.client.get(detail_url).json()["comment_count"], 1)
+        self.assertEqual(len(self.client.get(comments_url).json()["results"]), 1)
+
+    def test_moves_last_modified_but_not_updated_at_of_the_post(self) -> None:
+        url = f"/api/posts/{self.commented.slug}/"
+        updated_at = timezone.now() - timedelta(days=1)
+        Post.objects.filter(pk=self.commented.pk).update(updated_at=updated_at)
+        self.assertEqual(
+            self.client.get(url)["Last-Modified"], http_date(updated_at.timestamp())
+        )
+
+        self.add_comment(self.commented)
+
+        comment = Comment.objects.get(post=self.commented)
+        self.assertEqual(
+            self.client.get(url)["Last-Modified"],
+            http_date(comment.created_at.timestamp()),
+        )
+        self.commented.refresh_from_db()
+        self.assertEqual(self.commented.updated_at, updated_at)
+
+
+class PageETagTests(APITestCase):
+    author: User
+    post: Post
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.author = create_user("author@example.com")
+        cls.post = create_post(cls.author)
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def add_comment(self) -> None:
+        self.client.force_authenticate(self.author)
+        self.client.post(f"/api/posts/{self.post.slug}/comments/", {"body": "Comment"})
+        self.client.force_authenticate(None)
+
+    def test_answers_a_matching_etag_without_queries(self) -> None:
+        for url in ("/api/posts/", f"/api/posts/{self.post.slug}/comments/"):
+            with self.subTest(url=url):
+                etag = self.client.get(url)["ETag"]
+
+                with CaptureQueriesContext(connection) as context:
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(len(context), 0)
+
+    def test_changes_the_etag_with_the_content(self) -> None:
+        etag = self.client.get("/api/posts/")["ETag"]
+
+        self.add_comment()
+        response = self.client.get("/api/posts/", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_answers_a_matching_post_detail_etag(self) -> None:
+        url = f"/api/posts/{self.post.slug}/"
+        etag = self.client.get(url)["ETag"]
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.add_comment()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class CommentQueryBudgetTests(APITestCase):
+    author: User
+    post: Post
+    comment: Comment
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.author = create_user("author@example.com")
+        cls.post = create_post(cls.author)
+
+        for i in range(5):
+            author = create_user(f"commenter{i}@example.com")
+            Comment.objects.create(post=cls.post, author=author, body="Comment")
+
+        cls.comment = Comment.objects.create(
+            post=cls.post, author=cls.author, body="Comment"
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client.force_authenticate(self.author)
+        self.url = f"/api/posts/{self.post.slug}/comments/{self.comment.pk}/"
+
+    def test_list(self) -> None:
+        with assert_max_queries(1):
+            response = self.client.get(f"/api/posts/{self.post.slug}/comments/")
+
+        self.assertEqual(len(response.json()["results"]), 6)
+
+    def test_update(self) -> None:
+        with assert_max_queries(2):
+            response = self.client.patch(self.url, {"body": "Edited"}, format="json")
+
+        self.assertEqual(response.status_code, 204, response.content)
+
+    def test_delete(self) -> None:
+        # The comment with its post, the delete and the count update, plus the
+        # savepoint the test transaction turns the service's atomic() into
+        with assert_max_queries(5):
+            response = self.client.delete(self.url)
+
+        self.assertEqual(response.status_code, 204, response.content)
+
+
+class OutboxRelayTests(TestCase):
+    author: User
+    post: Post
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.author = create_user("author@example.com")
+        cls.post = create_post(cls.author)
+
+    def setUp(self) -> None:
+        self.pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        self.pubsub.subscribe(Channels.COMMENTS)
+        self.addCleanup(self.pubsub.close)
+        # Waits for the subscription, its confirmation is ignored
+        self.pubsub.get_message(timeout=1)
+
+    def add_comments(self, *bodies: str) -> list[Comment]:
+        return [
+            Comment.objects.create(post=self.post, author=self.author, body=i)
+            for i in bodies
+        ]
+
+    def get_published(self) -> list[str]:
+        bodies = []
+
+        while message := self.pubsub.get_message(timeout=0.5):
+            bodies.append(json.loads(message["data"])["body"])
+
+        return bodies
+
+    def test_relays_events_in_id_order(self) -> None:
+        self.add_comments("First", "Second", "Third")
+
+        self.assertEqual(relay_batch(2), 2)
+        self.assertEqual(relay_batch(2), 1)
+
+        self.assertEqual(self.get_published(), ["First", "Second", "Third"])
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_keeps_a_failed_batch_and_counts_the_attempt(self) -> None:
+        self.add_comments("First", "Second")
+
+        with (
+            mock.patch.object(redis_client, "pipeline", side_effect=RedisError),
+            self.assertRaises(RedisError),
+        ):
+            relay_batch(10)
+
+        self.assertEqual(
+            list(OutboxEvent.objects.order_by("id").values_list("attempts", flat=True)),
+            [1, 1],
+        )
+        self.assertEqual(relay_batch(10), 2)
+        self.assertEqual(self.get_published(), ["First", "Second"])
+
+    def test_raises_the_relay_error_if_the_attempt_cant_be_counted(self) -> None:
+        self.add_comments("First")
+
+        with (
+            mock.patch.object(redis_client, "pipeline", side_effect=RedisError),
+            mock.patch.object(QuerySet, "update", side_effect=DatabaseError),
+            self.assertRaises(RedisError),
+        ):
+            relay_batch(10)
+
+    def test_writes_no_event_for_a_rolled_back_comment(self) -> None:
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.add_comments("Rolled back")
+            raise RuntimeError
+
+        self.assertFalse(OutboxEvent.objects.exists())
+        self.assertEqual(relay_batch(10), 0)
+
+
+class StreamListenerTests(SimpleTestCase):
+    def setUp(self) -> None:
+        self.stream = f"test.{uuid.uuid4().hex}.stream"
+        self.addCleanup(redis_client.delete, self.stream)
+        self.command = ListenCommentsCommand()
+        self.command._create_group(self.stream, "group")
+
+    def add_events(self, *bodies: str) -> None:
+        for body in bodies:
+            redis_client.xadd(self.stream, {"payload": json.dumps({"body": body})})
+
+    def get_pending(self) -> int:
+        pending: int = redis_client.xpending(self.stream, "group")["pending"]
+        return pending
+
+    def capture(self, func: Callable[..., Any], *args: Any) -> list[str]:
+        output = io.StringIO()
+
+        with contextlib.redirect_stdout(output):
+            func(*args)
+
+        return [ast.literal_eval(i)["body"] for i in output.getvalue().splitlines()]
+
+    def poll(self, consumer: str, claim_idle_ms: int = 60_000) -> list[str]:
+        return self.capture(
+            self.command._poll, self.stream, "group", consumer, 10, claim_idle_ms, "0-0"
+        )
+
+    def test_reads_and_acks_new_events(self) -> None:
+        self.add_events("First", "Second")
+
+        self.assertEqual(self.poll("a"), ["First", "Second"])
+        self.assertEqual(self.get_pending(), 0)
+        self.assertEqual(self.poll("a"), [])
+
+    def test_shares_events_within_the_group(self) -> None:
+        self.add_events("First")
+        self.assertEqual(self.poll("a"), ["First"])
+
+        self.add_events("Second")
+        self.assertEqual(self.poll("b"), ["Second"])
+
+    def test_replays_own_unacked_events(self) -> None:
+        self.add_events("First", "Second")
+        # Delivered, then the listener died before acking
+        self.command._read(self.stream, "group", "a", 10, ">")
+
+        replayed = self.capture(self.command._replay, self.stream, "group", "a", 1)
+
+        self.assertEqual(replayed, ["First", "Second"])
+        self.assertEqual(self.get_pending(), 0)
+
+    def test_claims_events_left_unacked_by_other_consumers(self) -> None:
+        self.add_events("First")
+        self.command._read(self.stream, "group", "a", 10, ">")
+
+        self.assertEqual(self.poll("b"), [])
+        self.assertEqual(self.poll("b", claim_idle_ms=0), ["First"])
+        self.assertEqual(self.get_pending(), 0)
+
+    def test_creates_the_group_once(self) -> None:
+        self.command._create_group(self.stream, "group")
+
+        self.assertEqual(len(redis_client.xinfo_groups(self.stream)), 1)
+
+    def test_defaults_to_a_consumer_per_process(self) -> None:
+        parser = self.command.create_parser("manage.py", "listen_comments")
+
+        self.assertEqual(
+            parser.parse_args([]).consumer, f"{socket.gethostname()}-{os.getpid()}"
+        )
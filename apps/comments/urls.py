@@ -1,6 +1,6 @@
 from django.urls import path
 
-from .views import CommentViewSet
+from .views import CommentExportViewSet, CommentViewSet
 
 urlpatterns = [
     path(
@@ -11,4 +11,5 @@ urlpatterns = [
         "posts/<slug:post_slug>/comments/<int:comment_id>/",
         CommentViewSet.as_view({"delete": "delete", "patch": "partial_update"}),
     ),
+    path("export/comments/", CommentExportViewSet.as_view({"get": "list"})),
 ]
@@ -1,56 +1,110 @@
+import asyncio
+import json
+import time
 from logging import getLogger
-from typing import Any, cast
+from typing import Any, AsyncIterator, cast
 
+from django.core.cache import cache
+from django.http import Http404, HttpRequest, HttpResponse, StreamingHttpResponse
+from django.utils.cache import patch_response_headers
 from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from django.utils.functional import cached_property
+from django.views.decorators.http import require_GET
+from rest_framework.permissions import IsAdminUser, IsAuthenticatedOrReadOnly
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.status import HTTP_201_CREATED, HTTP_204_NO_CONTENT
-from rest_framework.utils.serializer_helpers import ReturnList
 from rest_framework.viewsets import ViewSet
 
+from apps.posts.cache import invalidate_post_detail, invalidate_post_pages
 from apps.posts.models import Post
-from common.clear_cache import clear_cache
+from common.async_views import async_read_view, render_json
+from common.cache import cache_page, get_page_etag, get_page_key, invalidate_tags
+from common.conditional import apply_conditional
+from common.export import iter_ndjson, ndjson_response
 from common.get_required_field import require_field
 from common.pagination import CustomPagination
 from common.security import sanitize_html_input
+from common.serializers import Row
 from settings.conf import settings
 
 from .models import Comment
-from .serializers import CommentCreateSerializer, CommentRetrieveSerializer
+from .serializers import (
+    CommentCreateSerializer,
+    CommentRetrieveSerializer,
+    comment_values_serializer,
+)
 from .service import CommentService
+from .streams import get_broadcaster
 
 logger = getLogger(__name__)
 
 
+@async_read_view
+async def async_comment_list(
+    request: HttpRequest, post_slug: str
+) -> HttpResponse | None:
+    entry: dict[str, Any] | None = await cache.aget(
+        get_page_key(settings.redis.prefix.comment_list, request)
+    )
+
+    # Misses and stale pages need the sync view to compute or refresh them
+    if entry is None or entry.get("fresh_until", 0) < time.time():
+        return None
+
+    def get_response() -> HttpResponse:
+        response = render_json(entry["data"], entry["status"])
+        patch_response_headers(response, settings.redis.page_timeout)
+        return response
+
+    return apply_conditional(request, (get_page_etag(entry), None), get_response)
+
+
 class CommentViewSet(ViewSet):
     permission_classes = [IsAuthenticatedOrReadOnly]
     lookup_field = "comment_id"
-    paginator = CustomPagination()
+
+    @cached_property
+    def paginator(self) -> CustomPagination:
+        return CustomPagination()
 
     def _get_post(self, post_slug: str) -> Post:
         return Post.objects.get(slug=post_slug)
 
-    def _clear_cache(self) -> None:
-        clear_cache(prefix=settings.redis.prefix.comment_list)
-        logger.debug("Cache cleared, prefix %r", settings.redis.prefix.comment_list)
-
-    @method_decorator(cache_page(60, key_prefix=settings.redis.prefix.comment_list))
+    def _clear_cache(self, post_slug: str) -> None:
+        tag = f"{settings.redis.prefix.comment_list}.{post_slug}"
+        invalidate_tags(tag)
+        logger.debug("Cache cleared, tag %r", tag)
+
+    def _clear_post_cache(self, post: Post) -> None:
+        # Posts embed their comment_count, only pages listing this one change
+        invalidate_post_pages(post.id)
+        invalidate_post_detail(post.slug)
+
+    @method_decorator(
+        cache_page(
+            settings.redis.page_timeout,
+            key_prefix=settings.redis.prefix.comment_list,
+            tags=(settings.redis.prefix.comment_list + ".{post_slug}",),
+        )
+    )
     def list(self, request: Request, post_slug: str) -> Response:
         logger.debug("Fetching comments, post_slug: %r", post_slug)
 
-        comments = cast(
-            list[Comment],
+        rows = cast(
+            list[Row],
             self.paginator.paginate_queryset(
-                queryset=Comment.objects.filter(post__slug=post_slug), request=request
+                queryset=comment_values_serializer.values(
+                    Comment.objects.filter(post__slug=post_slug)
+                ),
+                request=request,
             ),
         )
 
         if settings.log.debug_allowed:
-            logger.debug("Found %s comments", len(comments))
+            logger.debug("Found %s comments", len(rows))
 
-        result = cast(ReturnList, CommentRetrieveSerializer(comments, many=True).data)
+        result = comment_values_serializer.many(rows)
         return self.paginator.get_paginated_response(result)
 
     def create(self, request: Request, post_slug: str) -> Response:
@@ -65,10 +119,16 @@ class CommentViewSet(ViewSet):
         serializer.is_valid(raise_exception=True)
         logger.debug("body validated")
 
-        comment = serializer.save(post=self._get_post(post_slug), author=request.user)
+        post = self._get_post(post_slug)
+        comment = CommentService.create_comment(
+            post=post,
+            author=request.user,
+            body=serializer.validated_data["body"],
+        )
         logger.info("Comment added")
 
-        self._clear_cache()
+        self._clear_cache(post_slug)
+        self._clear_post_cache(post)
 
         return Response(
             CommentRetrieveSerializer(comment).data, status=HTTP_201_CREATED
@@ -80,7 +140,7 @@ class CommentViewSet(ViewSet):
         )
         logger.debug("post_slug: %r", post_slug)
 
-        comment = Comment.objects.get(pk=comment_id)
+        comment = Comment.objects.select_related("post").get(pk=comment_id)
         if post_slug != comment.post.slug:
             logger.warning("Comment doesn't belong to this post")
             return Response(
@@ -90,10 +150,11 @@ class CommentViewSet(ViewSet):
         CommentService.check_permission_to_delete(user=request.user, comment=comment)
         logger.debug("Permission checks passed")
 
-        comment.delete()
+        CommentService.delete_comment(comment)
         logger.info("Comment deleted")
 
-        self._clear_cache()
+        self._clear_cache(post_slug)
+        self._clear_post_cache(comment.post)
 
         return Response(status=HTTP_204_NO_CONTENT)
 
@@ -103,7 +164,7 @@ class CommentViewSet(ViewSet):
         )
         logger.debug("post_slug: ", post_slug)
 
-        comment = Comment.objects.get(pk=comment_id)
+        comment = Comment.objects.select_related("post").get(pk=comment_id)
         if post_slug != comment.post.slug:
             logger.warning("Comment doesn't belong to this post")
             return Response(
@@ -122,6 +183,71 @@ class CommentViewSet(ViewSet):
         comment.save()
         logger.info("Comment updated")
 
-        self._clear_cache()
+        self._clear_cache(post_slug)
 
         return Response(status=HTTP_204_NO_CONTENT)
+
+
+class CommentExportViewSet(ViewSet):
+    permission_classes = [IsAdminUser]
+
+    def list(self, request: Request) -> StreamingHttpResponse:
+        logger.info("Exporting comments")
+
+        return ndjson_response(
+            request,
+            iter_ndjson(
+                Comment.objects.all(),
+                comment_values_serializer,
+                settings.export.chunk_size,
+            ),
+            filename="comments.ndjson",
+        )
+
+
+@require_GET
+async def stream_comments(
+    request: HttpRequest, post_slug: str
+) -> StreamingHttpResponse:
+    """
+    Streams new comments of a post as Server-Sent Events.
+
+    Only routed under ASGI, see ``settings.urls_asgi``.
+    """
+    try:
+        post = await Post.objects.only("id").aget(slug=post_slug)
+    except Post.DoesNotExist:
+        raise Http404(f"Post {post_slug!r} doesn't exist")
+
+    logger.debug("Streaming comments, post_id: %s", post.id)
+    broadcaster = get_broadcaster()
+
+    async def events() -> AsyncIterator[str]:
+        # Subscribed on first read, a response that's never sent can't leak
+        queue = broadcaster.subscribe(post.id)
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), settings.streams.heartbeat_interval
+                    )
+                except TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+
+                if event is None:
+                    break
+
+                yield (
+                    f"id: {event['id']}\nevent: comment\n"
+                    f"data: {json.dumps(event)}\n\n"
+                )
+        finally:
+            broadcaster.unsubscribe(post.id, queue)
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Keeps nginx from buffering the stream
+    response["X-Accel-Buffering"] = "no"
+
+    return response
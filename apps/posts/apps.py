@@ -1,5 +1,23 @@
+from typing import Any
+
 from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import post_migrate
+
+
+def ensure_search_index(using: str, **kwargs: Any) -> None:
+    from .search import restore_search_index
+
+    connection = connections[using]
+
+    if connection.vendor == "sqlite":
+        restore_search_index(connection)
 
 
 class PostsConfig(AppConfig):
     name = "apps.posts"
+
+    def ready(self) -> None:
+        post_migrate.connect(ensure_search_index, sender=self)
+
+        return super().ready()
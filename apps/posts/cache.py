@@ -0,0 +1,97 @@
+from logging import getLogger
+from typing import Any
+
+from django.core.cache import cache
+from django.db.models import OuterRef, QuerySet, Subquery
+
+from apps.comments.models import Comment
+from common.cache import invalidate_tags
+from settings.conf import settings
+
+from .models import Post
+from .serializers import post_values_serializer
+
+logger = getLogger(__name__)
+
+
+def get_post_detail_key(slug: str) -> str:
+    return f"{settings.redis.prefix.post_detail}.{slug}"
+
+
+def get_post_list_tag(post_id: int) -> str:
+    """Tag of every cached post list page that includes the post."""
+    return f"{settings.redis.prefix.post_list}.{post_id}"
+
+
+def _get_post_detail_queryset(slug: str) -> QuerySet:
+    newest_comment = Comment.objects.filter(post=OuterRef("pk")).order_by("-created_at")
+
+    rows: QuerySet = post_values_serializer.values(Post.objects.filter(slug=slug))
+    rows = rows.annotate(
+        last_comment_at=Subquery(newest_comment.values("created_at")[:1])
+    )
+
+    return rows
+
+
+def _make_post_detail(row: dict[str, Any]) -> dict[str, Any]:
+    # Comments leave the post's updated_at alone but still change the page
+    last_modified = max(row["updated_at"], row["last_comment_at"] or row["updated_at"])
+
+    return {
+        "data": post_values_serializer.to_representation(row),
+        "last_modified": last_modified,
+    }
+
+
+def get_post_detail(slug: str) -> dict[str, Any]:
+    """
+    Read-through cache of the serialized post as ``data``, with its
+    ``last_modified``, the newest of its ``updated_at`` and its comments.
+
+    :raises Post.DoesNotExist:
+    """
+    key = get_post_detail_key(slug)
+    entry: dict[str, Any] | None = cache.get(key)
+
+    # Entries cached before last_modified was kept with the post are misses
+    if entry is not None and "data" in entry:
+        logger.debug("Post cache hit, slug: %r", slug)
+        return entry
+
+    entry = _make_post_detail(_get_post_detail_queryset(slug).get())
+    cache.set(key, entry, settings.redis.post_detail_timeout)
+    logger.debug("Post cache miss, slug: %r", slug)
+
+    return entry
+
+
+async def aget_post_detail(slug: str) -> dict[str, Any]:
+    """
+    ``get_post_detail`` for async views.
+
+    :raises Post.DoesNotExist:
+    """
+    key = get_post_detail_key(slug)
+    entry: dict[str, Any] | None = await cache.aget(key)
+
+    # Entries cached before last_modified was kept with the post are misses
+    if entry is not None and "data" in entry:
+        logger.debug("Post cache hit, slug: %r", slug)
+        return entry
+
+    entry = _make_post_detail(await _get_post_detail_queryset(slug).aget())
+    await cache.aset(key, entry, settings.redis.post_detail_timeout)
+    logger.debug("Post cache miss, slug: %r", slug)
+
+    return entry
+
+
+def invalidate_post_detail(*slugs: str) -> None:
+    cache.delete_many([get_post_detail_key(i) for i in set(slugs)])
+    logger.debug("Post cache invalidated, slugs: %s", slugs)
+
+
+def invalidate_post_pages(*post_ids: int) -> None:
+    """Drops only the cached post list pages that include one of the posts."""
+    invalidate_tags(*(get_post_list_tag(i) for i in set(post_ids)))
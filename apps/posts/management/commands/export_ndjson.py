@@ -0,0 +1,49 @@
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser, OutputWrapper
+from django.db.models import QuerySet
+
+from apps.comments.models import Comment
+from apps.comments.serializers import comment_values_serializer
+from apps.posts.models import Post
+from apps.posts.serializers import post_values_serializer
+from common.export import iter_ndjson
+from common.serializers import ValuesSerializer
+from settings.conf import settings
+
+EXPORTS: dict[str, tuple[QuerySet, ValuesSerializer]] = {
+    "posts": (Post.objects.all(), post_values_serializer),
+    "comments": (Comment.objects.all(), comment_values_serializer),
+}
+
+
+class Command(BaseCommand):
+    help = "Dump posts or comments as NDJSON with constant memory"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("table", choices=sorted(EXPORTS))
+        parser.add_argument("--output", help="File to write, stdout by default")
+        parser.add_argument(
+            "--chunk-size", type=int, default=settings.export.chunk_size
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        queryset, serializer = EXPORTS[options["table"]]
+        started = time.perf_counter()
+        output = (
+            OutputWrapper(open(options["output"], "w"))
+            if options["output"]
+            else self.stdout
+        )
+
+        try:
+            for lines in iter_ndjson(queryset, serializer, options["chunk_size"]):
+                output.write(lines, ending="")
+        finally:
+            if output is not self.stdout:
+                output.close()
+
+        self.stderr.write(
+            f"Exported {options['table']} in {time.perf_counter() - started:.1f}s"
+        )
@@ -0,0 +1,322 @@
+import json
+import sys
+import time
+from itertools import islice
+from logging import getLogger
+from typing import Any, Iterable, Iterator, Sequence, TextIO, cast
+from uuid import UUID
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Field, Model
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.categories.models import Category
+from apps.comments.models import Comment
+from apps.posts.enums import StatusEnum
+from apps.posts.models import Post
+from apps.users.models import User
+from common.cache import invalidate_tags
+from common.security import sanitize_data
+from common.slugs import UniqueSlugField, generate_unique_slugs
+from settings.conf import settings
+
+logger = getLogger(__name__)
+
+POST_COPY_FIELDS = (
+    "author",
+    "title",
+    "slug",
+    "body",
+    "category",
+    "status",
+    "created_at",
+    "updated_at",
+    "comment_count",
+)
+COMMENT_COPY_FIELDS = ("post", "author", "body", "created_at")
+
+# A concurrent create can take a generated slug between lookup and insert
+SLUG_ATTEMPTS = 3
+
+
+class RowError(Exception):
+    pass
+
+
+def _read_chunks(file: TextIO, size: int) -> Iterator[list[tuple[int, str]]]:
+    lines = ((number, line) for number, line in enumerate(file, 1) if line.strip())
+
+    while chunk := list(islice(lines, size)):
+        yield chunk
+
+
+def _copy(
+    model: type[Model], field_names: Iterable[str], objs: Sequence[Model]
+) -> None:
+    fields = [cast(Field, model._meta.get_field(i)) for i in field_names]
+    columns = ", ".join(connection.ops.quote_name(cast(str, i.column)) for i in fields)
+    table = connection.ops.quote_name(model._meta.db_table)
+
+    with connection.cursor() as cursor:
+        with cursor.cursor.copy(f"COPY {table} ({columns}) FROM STDIN") as copy:
+            for obj in objs:
+                copy.write_row(
+                    [
+                        i.get_db_prep_save(getattr(obj, i.attname), connection)
+                        for i in fields
+                    ]
+                )
+
+
+class Command(BaseCommand):
+    help = (
+        "Import posts and their comments from a JSONL file, one post per line: "
+        '{"title", "body", "status", "category_id", "author_id", "created_at", '
+        '"comments": [{"author_id", "body", "created_at"}]}'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("path", help="JSONL file, - reads stdin")
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument(
+            "--author", help="Email of the author of rows without author_id"
+        )
+        parser.add_argument(
+            "--no-copy",
+            action="store_true",
+            help="Use bulk_create on PostgreSQL instead of COPY",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options["chunk_size"] <= 0:
+            raise CommandError("--chunk-size must be a positive number")
+
+        self.default_author_id: UUID | None = None
+        if options["author"]:
+            try:
+                self.default_author_id = User.objects.get(email=options["author"]).id
+            except User.DoesNotExist:
+                raise CommandError(f"User {options['author']!r} doesn't exist")
+
+        with connection.cursor() as cursor:
+            # COPY needs psycopg 3
+            self.use_copy = (
+                connection.vendor == "postgresql"
+                and not options["no_copy"]
+                and hasattr(cursor.cursor, "copy")
+            )
+        self.posts_count = self.comments_count = self.skipped = 0
+        started = time.perf_counter()
+
+        file = sys.stdin if options["path"] == "-" else open(options["path"])
+        try:
+            for chunk in _read_chunks(file, options["chunk_size"]):
+                self._import_chunk(chunk)
+        finally:
+            if file is not sys.stdin:
+                file.close()
+
+            # Once for the whole import, even if it stopped halfway
+            if self.posts_count:
+                invalidate_tags(
+                    settings.redis.prefix.post_list, settings.redis.prefix.comment_list
+                )
+
+        elapsed = time.perf_counter() - started
+        rows = self.posts_count + self.comments_count
+        self.stdout.write(
+            f"Imported {self.posts_count} posts and {self.comments_count} comments "
+            f"in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):.0f} rows/s), "
+            f"skipped {self.skipped} lines"
+        )
+
+    def _import_chunk(self, chunk: list[tuple[int, str]]) -> None:
+        records: list[tuple[int, dict[str, Any]]] = []
+        for number, line in chunk:
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("Expected a JSON object")
+                if not isinstance(record.get("comments") or [], list):
+                    raise ValueError("comments must be a list")
+                records.append((number, sanitize_data(record)))
+            except ValueError as e:
+                self._skip(number, e)
+
+        known_categories, known_authors = self._lookup_references(
+            [record for _, record in records]
+        )
+
+        posts: list[Post] = []
+        comments: list[list[Comment]] = []
+        now = timezone.now()
+
+        for number, record in records:
+            try:
+                post = self._build_post(record, known_categories, known_authors, now)
+                post_comments = [
+                    self._build_comment(i, known_authors, now)
+                    for i in record.get("comments") or ()
+                ]
+            except RowError as e:
+                self._skip(number, e)
+                continue
+
+            post.comment_count = len(post_comments)
+            posts.append(post)
+            comments.append(post_comments)
+
+        self._insert(posts, comments)
+        self.posts_count += len(posts)
+        self.comments_count += sum(len(i) for i in comments)
+        logger.info("Imported %d posts so far", self.posts_count)
+
+    def _lookup_references(
+        self, records: list[dict[str, Any]]
+    ) -> tuple[set[int], set[UUID]]:
+        category_ids = {i.get("category_id") for i in records}
+        author_ids = set()
+
+        for record in records:
+            for item in (record, *(record.get("comments") or ())):
+                try:
+                    author_ids.add(UUID(str(item.get("author_id"))))
+                except (AttributeError, ValueError):
+                    pass
+
+        known_categories = set(
+            Category.objects.filter(
+                id__in=[i for i in category_ids if isinstance(i, int)]
+            ).values_list("id", flat=True)
+        )
+        known_authors = set(
+            User.objects.filter(id__in=author_ids).values_list("id", flat=True)
+        )
+
+        return known_categories, known_authors
+
+    def _get_author_id(self, record: dict[str, Any], known: set[UUID]) -> UUID:
+        if record.get("author_id") is None:
+            if self.default_author_id is None:
+                raise RowError("author_id is missing and --author isn't set")
+            return self.default_author_id
+
+        try:
+            author_id = UUID(str(record["author_id"]))
+        except ValueError:
+            raise RowError(f"Invalid author_id {record['author_id']!r}")
+
+        if author_id not in known:
+            raise RowError(f"User {author_id} doesn't exist")
+
+        return author_id
+
+    def _get_created_at(self, record: dict[str, Any], now: Any) -> Any:
+        if record.get("created_at") is None:
+            return now
+
+        try:
+            created_at = parse_datetime(str(record["created_at"]))
+        except ValueError:
+            created_at = None
+
+        if created_at is None:
+            raise RowError(f"Invalid created_at {record['created_at']!r}")
+
+        if timezone.is_naive(created_at):
+            created_at = timezone.make_aware(created_at)
+
+        return created_at
+
+    def _build_post(
+        self,
+        record: dict[str, Any],
+        known_categories: set[int],
+        known_authors: set[UUID],
+        now: Any,
+    ) -> Post:
+        title, body = record.get("title"), record.get("body")
+
+        if not isinstance(title, str) or not title.strip():
+            raise RowError("title is required")
+        if len(title) > settings.post.title_max_length:
+            raise RowError("title is too long")
+        if not isinstance(body, str):
+            raise RowError("body is required")
+
+        status = record.get("status", StatusEnum.PUBLISHED)
+        if status not in StatusEnum:
+            raise RowError(f"Invalid status {status!r}")
+
+        category_id = record.get("category_id")
+        if category_id is not None and category_id not in known_categories:
+            raise RowError(f"Category {category_id!r} doesn't exist")
+
+        return Post(
+            author_id=self._get_author_id(record, known_authors),
+            title=title,
+            body=body,
+            status=status,
+            category_id=category_id,
+            created_at=self._get_created_at(record, now),
+            updated_at=now,
+        )
+
+    def _build_comment(
+        self, record: dict[str, Any], known_authors: set[UUID], now: Any
+    ) -> Comment:
+        if not isinstance(record, dict) or not isinstance(record.get("body"), str):
+            raise RowError("Comment body is required")
+
+        return Comment(
+            author_id=self._get_author_id(record, known_authors),
+            body=record["body"],
+            created_at=self._get_created_at(record, now),
+        )
+
+    def _insert(self, posts: list[Post], comments: list[list[Comment]]) -> None:
+        slug_field = cast(UniqueSlugField, Post._meta.get_field("slug"))
+
+        for attempt in range(1, SLUG_ATTEMPTS + 1):
+            for post, slug in zip(posts, generate_unique_slugs(slug_field, posts)):
+                setattr(post, slug_field.attname, slug)
+
+            try:
+                with transaction.atomic():
+                    self._insert_rows(posts, comments)
+                return
+
+            except IntegrityError:
+                if attempt == SLUG_ATTEMPTS:
+                    raise
+                logger.warning("Slug taken concurrently, retrying chunk")
+
+    def _insert_rows(self, posts: list[Post], comments: list[list[Comment]]) -> None:
+        if self.use_copy:
+            _copy(Post, POST_COPY_FIELDS, posts)
+            ids = dict(
+                Post.objects.filter(slug__in=[i.slug for i in posts]).values_list(
+                    "slug", "id"
+                )
+            )
+            for post in posts:
+                post.id = ids[post.slug]
+        else:
+            Post.objects.bulk_create(posts)
+
+        flat_comments = []
+        for post, post_comments in zip(posts, comments):
+            for comment in post_comments:
+                comment.post_id = post.id
+                flat_comments.append(comment)
+
+        if self.use_copy:
+            _copy(Comment, COMMENT_COPY_FIELDS, flat_comments)
+        else:
+            Comment.objects.bulk_create(flat_comments)
+
+    def _skip(self, number: int, error: Exception) -> None:
+        self.skipped += 1
+        self.stderr.write(f"Line {number} skipped: {error}")
@@ -0,0 +1,64 @@
+from logging import getLogger
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from apps.comments.models import Comment
+from apps.posts.cache import invalidate_post_detail, invalidate_post_pages
+from apps.posts.models import Post
+
+logger = getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Recount comments per post and fix drifted Post.comment_count values"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        batch_size: int = options["batch_size"]
+        actual_count = Coalesce(
+            Subquery(
+                Comment.objects.filter(post=OuterRef("pk"))
+                .order_by()
+                .values("post")
+                .annotate(count=Count("id"))
+                .values("count")
+            ),
+            0,
+        )
+
+        last_id = 0
+        checked = fixed = 0
+
+        while True:
+            ids = list(
+                Post.objects.filter(id__gt=last_id)
+                .order_by("id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+
+            last_id = ids[-1]
+            checked += len(ids)
+
+            drifted = Post.objects.filter(id__in=ids).exclude(
+                comment_count=actual_count
+            )
+            rows = list(drifted.values_list("id", "slug"))
+
+            if rows:
+                drifted_ids, slugs = zip(*rows)
+                # Recounted in the UPDATE itself, so concurrent comments are kept
+                fixed += Post.objects.filter(id__in=drifted_ids).update(
+                    comment_count=actual_count
+                )
+                invalidate_post_pages(*drifted_ids)
+                invalidate_post_detail(*slugs)
+                logger.info("Fixed comment_count of %d posts", len(rows))
+
+        self.stdout.write(f"Checked {checked} posts, fixed {fixed}")
@@ -0,0 +1,113 @@
+# Generated by Django 6.0.1 on 2026-10-18 03:35
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+import common.indexes
+
+
+class RunSQLOn(migrations.RunSQL):
+    """``RunSQL`` that's skipped on databases other than ``vendor``."""
+
+    def __init__(self, vendor, *args, **kwargs):
+        self.vendor = vendor
+        super().__init__(*args, **kwargs)
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == self.vendor:
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == self.vendor:
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0005_post_list_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=common.indexes.PostgreSQLGinIndex(
+                fields=["search_vector"], name="posts_search_vector_idx"
+            ),
+        ),
+        RunSQLOn(
+            "postgresql",
+            [
+                """
+                CREATE FUNCTION posts_search_vector_update() RETURNS trigger AS $$
+                BEGIN
+                    NEW.search_vector := setweight(
+                        to_tsvector('english', coalesce(NEW.title, '')), 'A'
+                    ) || setweight(
+                        to_tsvector('english', coalesce(NEW.body, '')), 'B'
+                    );
+                    RETURN NEW;
+                END
+                $$ LANGUAGE plpgsql
+                """,
+                """
+                CREATE TRIGGER posts_search_vector_trigger
+                BEFORE INSERT OR UPDATE OF title, body ON posts
+                FOR EACH ROW EXECUTE FUNCTION posts_search_vector_update()
+                """,
+                "UPDATE posts SET title = title",
+            ],
+            [
+                "DROP TRIGGER posts_search_vector_trigger ON posts",
+                "DROP FUNCTION posts_search_vector_update()",
+            ],
+        ),
+        # Later migrations that rebuild the posts table drop these triggers,
+        # apps.posts.apps restores them after every migrate
+        RunSQLOn(
+            "sqlite",
+            [
+                """
+                CREATE VIRTUAL TABLE posts_fts USING fts5(
+                    title, body, content='posts', content_rowid='id',
+                    tokenize='porter unicode61'
+                )
+                """,
+                """
+                CREATE TRIGGER posts_fts_insert AFTER INSERT ON posts BEGIN
+                    INSERT INTO posts_fts(rowid, title, body)
+                    VALUES (new.id, new.title, new.body);
+                END
+                """,
+                """
+                CREATE TRIGGER posts_fts_delete AFTER DELETE ON posts BEGIN
+                    INSERT INTO posts_fts(posts_fts, rowid, title, body)
+                    VALUES ('delete', old.id, old.title, old.body);
+                END
+                """,
+                """
+                CREATE TRIGGER posts_fts_update
+                AFTER UPDATE OF title, body ON posts BEGIN
+                    INSERT INTO posts_fts(posts_fts, rowid, title, body)
+                    VALUES ('delete', old.id, old.title, old.body);
+                    INSERT INTO posts_fts(rowid, title, body)
+                    VALUES (new.id, new.title, new.body);
+                END
+                """,
+                "INSERT INTO posts_fts(posts_fts) VALUES ('rebuild')",
+            ],
+            [
+                "DROP TRIGGER IF EXISTS posts_fts_update",
+                "DROP TRIGGER IF EXISTS posts_fts_delete",
+                "DROP TRIGGER IF EXISTS posts_fts_insert",
+                "DROP TABLE posts_fts",
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 03:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0006_post_search_vector"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="post",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
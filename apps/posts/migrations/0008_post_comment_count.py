@@ -0,0 +1,35 @@
+# Generated by Django 6.0.1 on 2026-10-18 03:42
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_comment_count(apps, schema_editor):
+    Post = apps.get_model("posts", "Post")
+    Comment = apps.get_model("comments", "Comment")
+
+    counts = (
+        Comment.objects.filter(post=models.OuterRef("pk"))
+        .order_by()
+        .values("post")
+        .annotate(count=models.Count("id"))
+        .values("count")
+    )
+    Post.objects.update(comment_count=Coalesce(models.Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0007_post_updated_at_auto_now"),
+        ("comments", "0002_comment_comments_post_created_id_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="comment_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_comment_count, migrations.RunPython.noop),
+    ]
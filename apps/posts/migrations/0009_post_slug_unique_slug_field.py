@@ -0,0 +1,22 @@
+# Generated by Django 6.0.1 on 2026-10-18 03:44
+
+from django.db import migrations
+
+import common.slugs
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0008_post_comment_count"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="post",
+            name="slug",
+            field=common.slugs.UniqueSlugField(
+                editable=False, max_length=250, populate_from="title", unique=True
+            ),
+        ),
+    ]
@@ -1,40 +1,74 @@
 from typing import ClassVar, Self
+from uuid import UUID
 
-from autoslug import AutoSlugField
-
+from django.contrib.postgres.search import SearchVectorField
 from django.db.models import (
     CASCADE,
     SET_NULL,
     CharField,
     DateTimeField,
     ForeignKey,
+    Index,
     Manager,
     Model,
+    PositiveIntegerField,
+    Q,
     TextField,
 )
 from django.utils import timezone
 
 from apps.users.models import User
+from common.indexes import PostgreSQLGinIndex
+from common.slugs import UniqueSlugField, UniqueSlugMixin
 from settings.conf import settings
 
 from .enums import StatusEnum
 
 
-class Post(Model):
+class Post(UniqueSlugMixin, Model):
     id: int
+    author_id: UUID
     author = ForeignKey(to=User, on_delete=CASCADE)
     title = CharField(max_length=settings.post.title_max_length, null=False)
-    slug = AutoSlugField(populate_from="title", unique=True, max_length=250)
+    slug = UniqueSlugField(populate_from="title", unique=True, max_length=250)
     body = TextField()
     category = ForeignKey("categories.Category", on_delete=SET_NULL, null=True)
     status = CharField(max_length=10, choices=[(i.value, i.value) for i in StatusEnum])
 
     created_at = DateTimeField(default=timezone.now)
-    updated_at = DateTimeField(default=timezone.now)
+    updated_at = DateTimeField(auto_now=True)
+
+    # Maintained by apps.comments.service, reconcile_comment_counts fixes drift
+    comment_count = PositiveIntegerField(default=0)
+
+    # Maintained by the database, see apps.posts.search
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         db_table = "posts"
         verbose_name = "post"
         verbose_name_plural = "posts"
+        indexes = [
+            Index(fields=["created_at", "id"], name="posts_created_at_id_idx"),
+            Index(
+                fields=["created_at", "id"],
+                condition=Q(status=StatusEnum.PUBLISHED.value),
+                name="posts_published_created_idx",
+            ),
+            Index(
+                fields=["status", "created_at", "id"], name="posts_status_created_idx"
+            ),
+            Index(
+                fields=["category", "status", "created_at", "id"],
+                name="posts_cat_status_created_idx",
+            ),
+            Index(
+                fields=["author", "status", "created_at", "id"],
+                name="posts_auth_status_created_idx",
+            ),
+            PostgreSQLGinIndex(
+                fields=["search_vector"], name="posts_search_vector_idx"
+            ),
+        ]
 
     objects: ClassVar[Manager[Self]]
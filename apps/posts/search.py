@@ -0,0 +1,107 @@
+import re
+from logging import getLogger
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.models import F, FloatField, QuerySet
+from django.db.models.expressions import RawSQL
+
+from .models import Post
+
+logger = getLogger(__name__)
+
+SEARCH_CONFIG = "english"
+
+_SQLITE_TRIGGERS = {
+    "posts_fts_insert": """
+        CREATE TRIGGER IF NOT EXISTS posts_fts_insert AFTER INSERT ON posts BEGIN
+            INSERT INTO posts_fts(rowid, title, body)
+            VALUES (new.id, new.title, new.body);
+        END
+    """,
+    "posts_fts_delete": """
+        CREATE TRIGGER IF NOT EXISTS posts_fts_delete AFTER DELETE ON posts BEGIN
+            INSERT INTO posts_fts(posts_fts, rowid, title, body)
+            VALUES ('delete', old.id, old.title, old.body);
+        END
+    """,
+    "posts_fts_update": """
+        CREATE TRIGGER IF NOT EXISTS posts_fts_update
+        AFTER UPDATE OF title, body ON posts BEGIN
+            INSERT INTO posts_fts(posts_fts, rowid, title, body)
+            VALUES ('delete', old.id, old.title, old.body);
+            INSERT INTO posts_fts(rowid, title, body)
+            VALUES (new.id, new.title, new.body);
+        END
+    """,
+}
+_SQLITE_REBUILD = "INSERT INTO posts_fts(posts_fts) VALUES ('rebuild')"
+
+_FTS5_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def restore_search_index(connection: BaseDatabaseWrapper) -> None:
+    """
+    Restores the triggers of the sqlite FTS5 index of the posts table.
+
+    Migration ``0006_post_search_vector`` creates the search index, but sqlite
+    drops the triggers whenever a later migration rebuilds the posts table.
+    PostgreSQL's trigger survives those, so this is a no-op there. Safe to
+    call repeatedly.
+    """
+    if connection.vendor != "sqlite":
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name = 'posts_fts' "
+            "OR type = 'trigger' AND tbl_name = 'posts'"
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = [name for name in _SQLITE_TRIGGERS if name not in existing]
+
+        # Before the migration there's nothing to restore
+        if "posts_fts" not in existing or not missing:
+            return
+
+        for name in missing:
+            cursor.execute(_SQLITE_TRIGGERS[name])
+        cursor.execute(_SQLITE_REBUILD)
+        logger.info("Search index rebuilt, triggers restored: %s", missing)
+
+
+def search_posts(queryset: QuerySet[Post], query: str) -> QuerySet[Post]:
+    """Filters ``queryset`` by a full-text query and orders it by relevance."""
+    vendor = connections[queryset.db].vendor
+
+    if vendor == "postgresql":
+        search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type="websearch")
+        queryset = queryset.filter(search_vector=search_query).annotate(
+            rank=SearchRank(F("search_vector"), search_query)
+        )
+
+    elif vendor == "sqlite":
+        terms = _FTS5_TERM_RE.findall(query)
+        if not terms:
+            return queryset.none()
+
+        # Quote every term so user input is never parsed as FTS5 syntax
+        match = " ".join(f'"{term}"' for term in terms)
+        queryset = queryset.filter(
+            id__in=RawSQL(
+                "SELECT rowid FROM posts_fts WHERE posts_fts MATCH %s", [match]
+            )
+        ).annotate(
+            rank=RawSQL(
+                "SELECT -bm25(posts_fts, 10.0, 1.0) FROM posts_fts "
+                "WHERE posts_fts MATCH %s AND posts_fts.rowid = posts.id",
+                [match],
+                output_field=FloatField(),
+            )
+        )
+
+    else:
+        raise RuntimeError(f"Full-text search is not supported on {vendor}")
+
+    return queryset.order_by("-rank", "-created_at", "-id")
@@ -4,6 +4,7 @@ from rest_framework.serializers import (
 )
 
 from apps.categories.models import Category
+from common.serializers import ValuesSerializer
 
 from .models import Post
 
@@ -31,4 +32,8 @@ class PostRetrieveSerializer(ModelSerializer):
             "updated_at",
             "author_id",
             "category_id",
+            "comment_count",
         )
+
+
+post_values_serializer = ValuesSerializer(PostRetrieveSerializer)
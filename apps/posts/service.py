@@ -1,15 +1,61 @@
+from uuid import UUID
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import ValidationError
+from django.db.models import QuerySet
+from django.http import QueryDict
+
 from apps.users.models import User
 from common.exceptions import PermissionException
 
+from .enums import StatusEnum
 from .models import Post
 
 
 class PostService:
+    @staticmethod
+    def filter_posts(params: QueryDict, user: User | AnonymousUser) -> QuerySet[Post]:
+        """
+        Applies the ``status``, ``category`` and ``author`` list filters.
+
+        Only published posts are listed unless ``status=draft`` is requested,
+        in which case the requesting user's own drafts are returned.
+
+        :raises ValidationError: If a filter value is malformed
+        :raises PermissionException: If an anonymous user requests drafts
+        """
+        status = params.get("status", StatusEnum.PUBLISHED)
+        if status not in StatusEnum:
+            raise ValidationError(
+                f"Invalid status {status!r}, allowed: {[i.value for i in StatusEnum]}"
+            )
+
+        queryset = Post.objects.filter(status=status)
+
+        if status == StatusEnum.DRAFT:
+            if not user.is_authenticated:
+                raise PermissionException("Authentication required to list drafts")
+            queryset = queryset.filter(author_id=user.pk)
+
+        if (category := params.get("category")) is not None:
+            if not category.isdigit():
+                raise ValidationError(f"Invalid category {category!r}")
+            queryset = queryset.filter(category_id=int(category))
+
+        if (author := params.get("author")) is not None:
+            try:
+                author_id = UUID(author)
+            except ValueError:
+                raise ValidationError(f"Invalid author {author!r}")
+            queryset = queryset.filter(author_id=author_id)
+
+        return queryset
+
     @staticmethod
     def check_permissions_to_update(post: Post, user: User) -> None:
         """:raises PermissionException:"""
 
-        if not post.author == user:
+        if post.author_id != user.pk:
             raise PermissionException(
                 "You don't have enough permissions to update this post"
             )
@@ -18,7 +64,7 @@ class PostService:
     def check_permissions_to_delete(post: Post, user: User) -> None:
         """:raises PermissionException:"""
 
-        if not post.author == user:
+        if post.author_id != user.pk:
             raise PermissionException(
                 "You don't have enough permissions to delete this post"
             )
@@ -1 +1,1134 @@
-# Create your tests here.
+import io
+import itertools
+import json
+import os
+import random
+import tempfile
+import time
+import uuid
+from typing import Any, Callable, cast
+from unittest import mock
+
+import bleach
+from asgiref.sync import sync_to_async
+from django_redis import get_redis_connection
+from django_redis.cache import RedisCache
+from rest_framework_simplejwt.tokens import AccessToken
+
+from django.core.cache import cache, caches
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.http import QueryDict
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, tag
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver
+from django.utils.http import urlencode
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from apps.categories.models import Category
+from apps.comments.models import Comment
+from apps.users.models import User
+from common.cache import invalidate_tags, set_tagged
+from common.cache_backends import LocalTier, TwoTierRedisCache
+from common.clear_cache import clear_cache
+from common.export import iter_ndjson
+from common.lru import ExpiringLRU
+from common.pagination import DEFAULT_ORDERING
+from common.security import sanitize_data, sanitize_html_input
+from common.slugs import UniqueSlugField, generate_unique_slugs
+from common.testing import asgi_request, assert_max_queries, measure, report
+from settings.asgi import application
+from settings.conf import CACHES, settings
+
+from .cache import get_post_detail_key
+from .enums import StatusEnum
+from .models import Post
+from .serializers import PostRetrieveSerializer, post_values_serializer
+from .service import PostService
+
+
+def create_user(email: str) -> User:
+    return User.objects.create_user(
+        email=email, first_name="Test", last_name="User", raw_password="Correct-Horse-9"
+    )
+
+
+def create_post(
+    author: User,
+    title: str = "Post",
+    status: StatusEnum = StatusEnum.PUBLISHED,
+    category: Category | None = None,
+) -> Post:
+    return Post.objects.create(
+        author=author, title=title, body="Body", status=status, category=category
+    )
+
+
+def get_slug_field() -> UniqueSlugField:
+    return cast(UniqueSlugField, Post._meta.get_field("slug"))
+
+
+class PostListFilterTests(APITestCase):
+    author: User
+    other: User
+    news: Category
+    sport: Category
+    published: Post
+    other_published: Post
+    draft: Post
+    other_draft: Post
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.author = create_user("author@example.com")
+        cls.other = create_user("other@example.com")
+        cls.news = Category.objects.create(name="News")
+        cls.sport = Category.objects.create(name="Sport")
+
+        cls.published = create_post(cls.author, category=cls.news)
+        cls.other_published = create_post(cls.other, category=cls.sport)
+        cls.draft = create_post(cls.author, status=StatusEnum.DRAFT)
+        cls.other_draft = create_post(cls.other, status=StatusEnum.DRAFT)
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def get_ids(self, params: dict[str, str]) -> set[int]:
+        response = self.client.get("/api/posts/", params)
+        self.assertEqual(response.status_code, 200, response.content)
+
+        return {i["id"] for i in response.json()["results"]}
+
+    def test_lists_only_published_by_default(self) -> None:
+        self.assertEqual(self.get_ids({}), {self.published.id, self.other_published.id})
+
+    def test_filters_by_category(self) -> None:
+        self.assertEqual(
+            self.get_ids({"category": str(self.news.pk)}), {self.published.id}
+        )
+
+    def test_filters_by_author(self) -> None:
+        self.assertEqual(
+            self.get_ids({"author": str(self.other.id)}), {self.other_published.id}
+        )
+
+    def test_lists_only_own_drafts(self) -> None:
+        self.client.force_authenticate(self.author)
+
+        self.assertEqual(self.get_ids({"status": "draft"}), {self.draft.id})
+
+    def test_drafts_bypass_the_page_lock(self) -> None:
+        self.client.force_authenticate(self.author)
+
+        # A held lock would make the request wait for a page never stored
+        with mock.patch("common.cache.acquire_lock", return_value=None) as lock:
+            self.assertEqual(self.get_ids({"status": "draft"}), {self.draft.id})
+
+        lock.assert_not_called()
+
+    def test_refuses_drafts_to_anonymous_users(self) -> None:
+        response = self.client.get("/api/posts/", {"status": "draft"})
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_rejects_malformed_filters(self) -> None:
+        for params in ({"status": "deleted"}, {"category": "x"}, {"author": "1"}):
+            with self.subTest(params=params):
+                response = self.client.get("/api/posts/", params)
+                self.assertEqual(response.status_code, 422)
+
+    def test_caches_each_filter_combination_separately(self) -> None:
+        self.assertEqual(len(self.get_ids({})), 2)
+        self.assertEqual(len(self.get_ids({"category": str(self.news.pk)})), 1)
+        self.assertEqual(len(self.get_ids({})), 2)
+
+
+class PostPaginationTests(APITestCase):
+    author: User
+    ids: list[int]
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.author = create_user("author@example.com")
+        posts = [create_post(cls.author, title=f"Post {i}") for i in range(25)]
+
+        # Imports give whole batches the same created_at
+        Post.objects.update(created_at=posts[0].created_at)
+        cls.ids = sorted((i.id for i in posts), reverse=True)
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def get_page(self, url: str) -> dict:
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+
+        return cast(dict, response.json())
+
+    def walk(self, url: str) -> list[list[int]]:
+        pages = []
+        next_url: str | None = url
+
+        while next_url:
+            page = self.get_page(next_url)
+            pages.append([i["id"] for i in page["results"]])
+            next_url = page["next"]
+
+        return pages
+
+    def test_pages_through_tied_rows_without_gaps_or_repeats(self) -> None:
+        pages = self.walk("/api/posts/?page_size=10")
+
+        self.assertEqual([len(i) for i in pages], [10, 10, 5])
+        self.assertEqual(list(itertools.chain(*pages)), self.ids)
+
+    def test_previous_link_returns_the_same_page(self) -> None:
+        first = self.get_page("/api/posts/?page_size=10")
+        second = self.get_page(first["next"])
+        third = self.get_page(second["next"])
+
+        self.assertIsNone(first["previous"])
+        self.assertIsNone(third["next"])
+        self.assertEqual(self.get_page(third["previous"]), second)
+        self.assertEqual(self.get_page(second["previous"])["results"], first["results"])
+
+    def test_pages_are_stable_while_posts_are_added(self) -> None:
+        first = self.get_page("/api/posts/?page_size=10")
+        create_post(self.author, title="Newer")
+        cache.clear()
+
+        second = self.get_page(first["next"])
+
+        self.assertEqual([i["id"] for i in second["results"]], self.ids[10:20])
+
+    def test_does_not_use_offset(self) -> None:
+        first = self.get_page("/api/posts/?page_size=10")
+        cache.clear()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.get_page(first["next"])
+
+        self.assertFalse(any("OFFSET" in i["sql"] for i in queries.captured_queries))
+
+    def test_rejects_a_tampered_cursor(self) -> None:
+        for cursor in ("garbage", "cD1bIngiXQ==", "cD1bIjEiXQ=="):
+            with self.subTest(cursor=cursor):
+                response = self.client.get("/api/posts/", {"cursor": cursor})
+                self.assertEqual(response.status_code, 404)
+
+    def test_offset_pagination_is_opt_in(self) -> None:
+        page = self.get_page("/api/posts/?limit=10&offset=20")
+
+        self.assertEqual(page["count"], 25)
+        self.assertEqual([i["id"] for i in page["results"]], self.ids[20:])
+
+
+class PostQueryBudgetTests(APITestCase):
+    post: Post
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        category = Category.objects.create(name="News")
+
+        for i in range(5):
+            author = create_user(f"author{i}@example.com")
+            cls.post = create_post(author, title=f"Post {i}", category=category)
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_list(self) -> None:
+        with assert_max_queries(1):
+            response = self.client.get("/api/posts/")
+
+        self.assertEqual(len(response.json()["results"]), 5)
+
+    def test_retrieve(self) -> None:
+        with assert_max_queries(1):
+            response = self.client.get(f"/api/posts/{self.post.slug}/")
+
+        self.assertEqual(response.status_code, 200)
+
+
+class PostSearchTests(APITestCase):
+    author: User
+    title_match: Post
+    body_match: Post
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.author = create_user("author@example.com")
+        cls.body_match = Post.objects.create(
+            author=cls.author,
+            title="Weekend notes",
+            body="Mostly about gardening",
+            status=StatusEnum.PUBLISHED,
+        )
+        cls.title_match = Post.objects.create(
+            author=cls.author,
+            title="Gardening in spring",
+            body="Seeds and soil",
+            status=StatusEnum.PUBLISHED,
+        )
+        create_post(cls.author, title="Unrelated")
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def search(self, q: str, **params: str) -> dict:
+        response = self.client.get("/api/posts/", {"q": q, **params})
+        self.assertEqual(response.status_code, 200, response.content)
+
+        return cast(dict, response.json())
+
+    def test_ranks_title_matches_first(self) -> None:
+        results = self.search("gardening")["results"]
+
+        self.assertEqual(
+            [i["id"] for i in results], [self.title_match.id, self.body_match.id]
+        )
+
+    def test_matches_word_stems(self) -> None:
+        results = self.search("gardens")["results"]
+
+        self.assertEqual(len(results), 2)
+
+    def test_follows_title_edits(self) -> None:
+        Post.objects.filter(pk=self.body_match.pk).update(title="Compost")
+
+        results = self.search("compost")["results"]
+
+        self.assertEqual([i["id"] for i in results], [self.body_match.id])
+
+    def test_treats_query_syntax_as_text(self) -> None:
+        for q in ('gardening"', "title:gardening", "gardening OR", "NEAR(", "*", "-"):
+            with self.subTest(q=q):
+                results = self.search(q)["results"]
+                self.assertLessEqual(len(results), 2)
+
+        self.assertEqual(self.search('"gardening*')["count"], 2)
+        self.assertEqual(self.search("body:seeds")["count"], 0)
+
+    def test_pages_results_by_offset(self) -> None:
+        first = self.search("gardening", limit="1")
+        second = self.client.get(first["next"]).json()
+
+        self.assertEqual(first["count"], 2)
+        self.assertEqual(
+            [i["id"] for i in first["results"] + second["results"]],
+            [self.title_match.id, self.body_match.id],
+        )
+        self.assertIsNone(second["next"])
+
+    def test_rejects_overlong_queries(self) -> None:
+        response = self.client.get("/api/posts/", {"q": "a" * 201})
+
+        self.assertEqual(response.status_code, 422)
+
+
+def make_two_tier_cache(channel: str) -> TwoTierRedisCache:
+    """A backend with a local tier of its own, like one in another process."""
+    params = CACHES["default"]
+    backend = TwoTierRedisCache(str(params["LOCATION"]), params)
+    backend.l1 = LocalTier(max_entries=10, timeout=5, channel=channel)
+
+    return backend
+
+
+def wait_until(predicate: Callable[[], bool], timeout: float = 2) -> bool:
+    deadline = time.monotonic() + timeout
+
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+
+    return True
+
+
+class TwoTierRedisCacheTests(SimpleTestCase):
+    def setUp(self) -> None:
+        channel = f"test.l1.{uuid.uuid4().hex}"
+        self.writer = make_two_tier_cache(channel)
+        self.reader = make_two_tier_cache(channel)
+        self.key = f"page.test.{uuid.uuid4().hex}"
+        self.full_key = self.reader.make_key(self.key)
+
+        for backend in (self.writer, self.reader):
+            self.assertTrue(wait_until(lambda: backend._uses_l1(self.key)))
+
+    def tearDown(self) -> None:
+        self.writer.delete(self.key)
+
+    def is_evicted(self) -> bool:
+        return self.reader.l1.get(self.full_key) is ExpiringLRU.MISSING
+
+    def test_evicts_keys_written_by_other_backends(self) -> None:
+        self.writer.set(self.key, 1)
+        self.assertEqual(self.reader.get(self.key), 1)
+        self.assertEqual(self.reader.l1.get(self.full_key), 1)
+
+        self.writer.set(self.key, 2)
+
+        self.assertTrue(wait_until(self.is_evicted))
+        self.assertEqual(self.reader.get(self.key), 2)
+
+    def test_evicts_keys_broadcast_after_direct_writes(self) -> None:
+        self.writer.set(self.key, 1)
+        self.reader.get(self.key)
+
+        self.writer.broadcast_invalidation([self.full_key])
+
+        self.assertTrue(wait_until(self.is_evicted))
+
+    def test_drops_values_read_before_an_eviction(self) -> None:
+        self.writer.set(self.key, 1)
+        read = RedisCache.get
+
+        def get_then_evict(*args: Any, **kwargs: Any) -> Any:
+            value = read(*args, **kwargs)
+            # Another request invalidates the key while this one is reading it
+            self.reader.l1.evict([self.full_key])
+            return value
+
+        with mock.patch.object(RedisCache, "get", get_then_evict):
+            self.assertEqual(self.reader.get(self.key), 1)
+
+        self.assertTrue(self.is_evicted())
+
+    def test_bypasses_the_local_tier_while_the_listener_is_down(self) -> None:
+        self.writer.set(self.key, 1)
+
+        with mock.patch.object(self.reader.l1, "is_ready", return_value=False):
+            self.assertEqual(self.reader.get(self.key), 1)
+            # Not announced, only seen because the local tier is skipped
+            get_redis_connection("default").set(
+                self.full_key, self.reader.client.encode(2)
+            )
+            self.assertEqual(self.reader.get(self.key), 2)
+
+        self.assertTrue(self.is_evicted())
+        self.assertEqual(self.reader.get_stats()["l1_hits"], 0)
+
+    def test_counts_hits_and_misses_per_tier(self) -> None:
+        self.reader.get(self.key)
+        self.writer.set(self.key, 1)
+        self.reader.get(self.key)
+        self.reader.get(self.key)
+        self.reader.get("other")
+
+        self.assertEqual(
+            self.reader.get_stats(),
+            {"l1_hits": 1, "l1_misses": 2, "l2_hits": 1, "l2_misses": 1},
+        )
+
+
+class AsyncReadViewTests(TransactionTestCase):
+    """Requests through the ASGI application and its async read views."""
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.post = create_post(create_user("author@example.com"))
+        self.fallback = mock.patch(
+            "common.async_views.get_resolver", wraps=get_resolver
+        ).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def warm(self, url: str) -> str:
+        """Caches the page through the sync view, returns its ETag."""
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.fallback.reset_mock()
+
+        return cast(str, response["ETag"])
+
+    async def test_serves_cached_pages_without_the_sync_view(self) -> None:
+        for url in ("/api/posts/", f"/api/posts/{self.post.slug}/comments/"):
+            with self.subTest(url=url):
+                await sync_to_async(self.warm)(url)
+
+                status, content = await asgi_request(application, "GET", url)
+
+                self.assertEqual(status, 200, content)
+                self.assertIn("results", json.loads(content))
+                self.fallback.assert_not_called()
+
+    async def test_answers_a_matching_etag_with_304(self) -> None:
+        etag = await sync_to_async(self.warm)("/api/posts/")
+
+        status, content = await asgi_request(
+            application, "GET", "/api/posts/", headers={"if-none-match": etag}
+        )
+
+        self.assertEqual(status, 304)
+        self.assertEqual(content, b"")
+        self.fallback.assert_not_called()
+
+    async def test_falls_back_to_the_sync_view_on_a_miss(self) -> None:
+        status, content = await asgi_request(application, "GET", "/api/posts/")
+
+        self.assertEqual(status, 200, content)
+        self.assertEqual(json.loads(content)["results"][0]["id"], self.post.id)
+        self.fallback.assert_called_once()
+
+        # The sync view cached the page for the next request
+        self.fallback.reset_mock()
+        await asgi_request(application, "GET", "/api/posts/")
+        self.fallback.assert_not_called()
+
+    async def test_reads_post_details_with_the_async_orm(self) -> None:
+        url = f"/api/posts/{self.post.slug}/"
+
+        status, content = await asgi_request(application, "GET", url)
+
+        self.assertEqual(status, 200, content)
+        self.assertEqual(json.loads(content)["id"], self.post.id)
+        self.fallback.assert_not_called()
+
+    async def test_leaves_authenticated_requests_to_the_sync_view(self) -> None:
+        await sync_to_async(self.warm)("/api/posts/")
+
+        status, _ = await asgi_request(
+            application,
+            "GET",
+            "/api/posts/",
+            headers={"authorization": "Bearer invalid"},
+        )
+
+        self.assertEqual(status, 401)
+        self.fallback.assert_called_once()
+
+    async def test_leaves_writes_to_the_sync_view(self) -> None:
+        body = json.dumps({"title": "Post", "body": "Body"}).encode()
+
+        status, _ = await asgi_request(application, "POST", "/api/posts/", body)
+
+        self.assertEqual(status, 401)
+        self.fallback.assert_called_once()
+
+    async def test_answers_404_for_a_missing_post(self) -> None:
+        status, _ = await asgi_request(application, "GET", "/api/posts/missing/")
+
+        self.assertEqual(status, 404)
+        self.fallback.assert_called_once()
+
+
+class TagInvalidationTests(SimpleTestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.tag = f"test.{uuid.uuid4().hex}"
+        self.other_tag = f"test.{uuid.uuid4().hex}"
+
+    def test_deletes_only_the_tagged_keys(self) -> None:
+        set_tagged("page.a", 1, 60, [self.tag])
+        set_tagged("page.b", 2, 60, [self.tag, self.other_tag])
+        set_tagged("page.c", 3, 60, [self.other_tag])
+
+        self.assertEqual(invalidate_tags(self.tag), 2)
+
+        self.assertEqual(cache.get_many(["page.a", "page.b", "page.c"]), {"page.c": 3})
+        self.assertEqual(invalidate_tags(self.tag), 0)
+
+    def test_evicts_the_keys_from_the_local_tier(self) -> None:
+        backend = cast(TwoTierRedisCache, caches["default"])
+        self.assertTrue(wait_until(lambda: backend._uses_l1("page.a")))
+
+        set_tagged("page.a", 1, 60, [self.tag])
+        # An eviction published earlier, e.g. by cache.clear() in setUp, can
+        # arrive after the read from Redis, which then isn't kept in the tier
+        self.assertTrue(
+            wait_until(
+                lambda: cache.get("page.a") == 1
+                and backend.l1.get(cache.make_key("page.a")) == 1
+            )
+        )
+
+        invalidate_tags(self.tag)
+
+        self.assertIsNone(cache.get("page.a"))
+
+    def test_keeps_a_tag_as_long_as_its_longest_lived_key(self) -> None:
+        connection = get_redis_connection("default")
+        tag_key = cache.make_key(f"tag.{self.tag}")
+
+        set_tagged("page.a", 1, 100, [self.tag])
+        set_tagged("page.b", 2, 10, [self.tag])
+
+        self.assertGreater(connection.ttl(tag_key), 90)
+
+    def test_clear_cache_drops_every_page_under_the_prefix(self) -> None:
+        set_tagged("page.a", 1, 60, [self.tag])
+        set_tagged("page.b", 2, 60, [self.tag])
+
+        clear_cache(self.tag)
+
+        self.assertEqual(cache.get_many(["page.a", "page.b"]), {})
+
+    def test_ignores_an_empty_call(self) -> None:
+        self.assertEqual(invalidate_tags(), 0)
+
+
+class PostDetailCacheTests(APITestCase):
+    author: User
+    post: Post
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.author = create_user("author@example.com")
+        cls.post = create_post(cls.author)
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.url = f"/api/posts/{self.post.slug}/"
+
+    def test_reads_the_post_once(self) -> None:
+        self.client.get(self.url)
+
+        with assert_max_queries(0):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.json()["id"], self.post.id)
+
+    def test_drops_the_post_when_it_is_updated(self) -> None:
+        etag = self.client.get(self.url)["ETag"]
+        self.client.force_authenticate(self.author)
+
+        self.client.patch(self.url, {"title": "Edited"}, format="json")
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["title"], "Edited")
+
+    def test_drops_the_post_when_it_is_deleted(self) -> None:
+        self.client.get(self.url)
+        self.client.force_authenticate(self.author)
+
+        self.client.delete(self.url)
+
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_rereads_entries_cached_in_the_old_format(self) -> None:
+        cache.set(get_post_detail_key(self.post.slug), {"id": self.post.id})
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.json()["slug"], self.post.slug)
+
+
+class ImportPostsTests(TestCase):
+    author: User
+    news: Category
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.author = create_user("author@example.com")
+        cls.news = Category.objects.create(name="News")
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def run_import(self, records: list[Any], *args: str) -> tuple[str, str]:
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False) as file:
+            for record in records:
+                file.write(record if isinstance(record, str) else json.dumps(record))
+                file.write("\n")
+        self.addCleanup(os.remove, file.name)
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        call_command("import_posts", file.name, *args, stdout=stdout, stderr=stderr)
+
+        return stdout.getvalue(), stderr.getvalue()
+
+    def post_record(self, title: str = "Imported", **fields: Any) -> dict[str, Any]:
+        return {
+            "title": title,
+            "body": "Body",
+            "author_id": str(self.author.id),
+        } | fields
+
+    def test_imports_posts_with_their_comments(self) -> None:
+        comment = {"author_id": str(self.author.id), "body": "Comment"}
+        self.run_import(
+            [
+                self.post_record(
+                    category_id=self.news.pk,
+                    created_at="2024-01-02T03:04:05Z",
+                    comments=[comment, comment],
+                ),
+                self.post_record(status=StatusEnum.DRAFT),
+            ]
+        )
+
+        first, second = Post.objects.order_by("id")
+        self.assertEqual(first.category, self.news)
+        self.assertEqual(first.created_at.isoformat(), "2024-01-02T03:04:05+00:00")
+        self.assertEqual(first.comment_count, 2)
+        self.assertEqual(Comment.objects.filter(post=first).count(), 2)
+        self.assertEqual(second.status, StatusEnum.DRAFT)
+
+    def test_gives_colliding_titles_unique_slugs(self) -> None:
+        existing = create_post(self.author, title="Imported")
+
+        self.run_import([self.post_record(), self.post_record()], "--chunk-size", "1")
+
+        slugs = set(Post.objects.exclude(pk=existing.pk).values_list("slug", flat=True))
+        self.assertEqual(len(slugs), 2)
+        self.assertNotIn(existing.slug, slugs)
+
+    def test_skips_invalid_lines(self) -> None:
+        stdout, stderr = self.run_import(
+            [
+                "not json",
+                ["not", "an", "object"],
+                self.post_record(title=""),
+                self.post_record(status="deleted"),
+                self.post_record(category_id=999),
+                self.post_record(author_id=str(uuid.uuid4())),
+                self.post_record(created_at="yesterday"),
+                self.post_record(comments=[{"body": 1}]),
+                self.post_record(),
+            ]
+        )
+
+        self.assertEqual(Post.objects.count(), 1)
+        self.assertIn("Imported 1 posts", stdout)
+        self.assertIn("skipped 8 lines", stdout)
+        self.assertEqual(len(stderr.splitlines()), 8)
+
+    def test_sanitizes_imported_text(self) -> None:
+        self.run_import([self.post_record(body="<script>x</script>Body")])
+
+        self.assertNotIn("<script>", Post.objects.get().body)
+
+    def test_falls_back_on_the_given_author(self) -> None:
+        record = self.post_record()
+        del record["author_id"]
+
+        _, stderr = self.run_import([record])
+        self.assertIn("--author", stderr)
+
+        self.run_import([record], "--author", self.author.email)
+        self.assertEqual(Post.objects.get().author_id, self.author.id)
+
+    def test_rejects_invalid_options(self) -> None:
+        for args in (["--author", "missing@example.com"], ["--chunk-size", "0"]):
+            with self.subTest(args=args), self.assertRaises(CommandError):
+                self.run_import([], *args)
+
+    def test_drops_the_cached_list_pages(self) -> None:
+        self.assertEqual(self.client.get("/api/posts/").json()["results"], [])
+
+        self.run_import([self.post_record()])
+
+        self.assertEqual(len(self.client.get("/api/posts/").json()["results"]), 1)
+
+
+def create_admin() -> User:
+    return User.objects.create_superuser(
+        email="admin@example.com",
+        first_name="Test",
+        last_name="Admin",
+        password="Correct-Horse-9",
+    )
+
+
+def parse_ndjson(content: bytes | str) -> list[dict[str, Any]]:
+    return [json.loads(line) for line in content.splitlines()]
+
+
+class ExportTests(APITestCase):
+    admin: User
+    posts: list[Post]
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.admin = create_admin()
+        cls.posts = [create_post(cls.admin, title=f"Post {i}") for i in range(5)]
+        Comment.objects.create(post=cls.posts[0], author=cls.admin, body="Comment")
+
+    def export(self, url: str) -> list[dict[str, Any]]:
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(response["Cache-Control"], "no-store")
+
+        return parse_ndjson(b"".join(response.streaming_content))
+
+    def test_exports_posts_in_id_order(self) -> None:
+        rows = self.export("/api/export/posts/")
+
+        self.assertEqual(
+            rows,
+            json.loads(
+                JSONRenderer().render(
+                    PostRetrieveSerializer(self.posts, many=True).data
+                )
+            ),
+        )
+
+    def test_exports_comments(self) -> None:
+        rows = self.export("/api/export/comments/")
+
+        self.assertEqual([i["body"] for i in rows], ["Comment"])
+
+    def test_requires_an_admin(self) -> None:
+        response = self.client.get("/api/export/posts/")
+        self.assertEqual(response.status_code, 401)
+
+        self.client.force_authenticate(create_user("user@example.com"))
+        response = self.client.get("/api/export/comments/")
+        self.assertEqual(response.status_code, 403)
+
+    def test_yields_chunks_of_lines(self) -> None:
+        chunks = list(iter_ndjson(Post.objects.all(), post_values_serializer, 2))
+
+        self.assertEqual([len(parse_ndjson(i)) for i in chunks], [2, 2, 1])
+
+    def test_command_writes_the_same_lines(self) -> None:
+        stdout = io.StringIO()
+        call_command(
+            "export_ndjson",
+            "posts",
+            "--chunk-size",
+            "2",
+            stdout=stdout,
+            stderr=io.StringIO(),
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "comments.ndjson")
+            call_command(
+                "export_ndjson", "comments", "--output", path, stderr=io.StringIO()
+            )
+
+            with open(path) as file:
+                comments = parse_ndjson(file.read())
+
+        self.assertEqual(
+            parse_ndjson(stdout.getvalue()), self.export("/api/export/posts/")
+        )
+        self.assertEqual(comments, self.export("/api/export/comments/"))
+
+
+class AsyncExportTests(TransactionTestCase):
+    async def test_streams_the_export_under_asgi(self) -> None:
+        admin = await sync_to_async(create_admin)()
+        for i in range(3):
+            await sync_to_async(create_post)(admin, title=f"Post {i}")
+        token = str(AccessToken.for_user(admin))
+
+        with mock.patch.object(settings.export, "chunk_size", 1):
+            status, content = await asgi_request(
+                application,
+                "GET",
+                "/api/export/posts/",
+                headers={"authorization": f"Bearer {token}"},
+            )
+
+        self.assertEqual(status, 200, content)
+        self.assertEqual(
+            [i["title"] for i in parse_ndjson(content)], ["Post 0", "Post 1", "Post 2"]
+        )
+
+
+class PostListQueryPlanTests(TestCase):
+    author: User
+    category: Category
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.author = create_user("author@example.com")
+        cls.category = Category.objects.create(name="News")
+
+    def setUp(self) -> None:
+        if connection.vendor == "postgresql":
+            # Tables this small are scanned sequentially otherwise
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def get_plan(self, params: dict[str, str]) -> str:
+        queryset = PostService.filter_posts(
+            params=QueryDict(urlencode(params)), user=self.author
+        )
+        return queryset.order_by(*DEFAULT_ORDERING)[:20].explain()
+
+    def assert_uses_index(self, params: dict[str, str], *indexes: str) -> None:
+        plan = self.get_plan(params)
+
+        self.assertTrue(
+            any(i in plan for i in indexes), f"None of {indexes} used:\n{plan}"
+        )
+
+    def test_published_list_uses_index(self) -> None:
+        self.assert_uses_index(
+            {}, "posts_published_created_idx", "posts_status_created_idx"
+        )
+
+    def test_category_filter_uses_index(self) -> None:
+        self.assert_uses_index(
+            {"category": str(self.category.pk)}, "posts_cat_status_created_idx"
+        )
+
+    def test_author_filter_uses_index(self) -> None:
+        self.assert_uses_index(
+            {"author": str(self.author.id)}, "posts_auth_status_created_idx"
+        )
+
+    def test_draft_list_uses_index(self) -> None:
+        self.assert_uses_index(
+            {"status": StatusEnum.DRAFT},
+            "posts_auth_status_created_idx",
+            "posts_status_created_idx",
+        )
+
+
+class PostValuesSerializerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        author = create_user("author@example.com")
+        category = Category.objects.create(name="News")
+
+        create_post(author, title="With category", category=category)
+        create_post(author, title="Without category", status=StatusEnum.DRAFT)
+
+    def test_renders_the_same_json_as_the_model_serializer(self) -> None:
+        posts = Post.objects.order_by("id")
+        rows = post_values_serializer.values(posts)
+
+        self.assertEqual(
+            JSONRenderer().render(post_values_serializer.many(rows)),
+            JSONRenderer().render(PostRetrieveSerializer(posts, many=True).data),
+        )
+
+    def test_selects_only_the_serialized_columns(self) -> None:
+        row = post_values_serializer.values(Post.objects.all())[0]
+
+        self.assertEqual(list(row), list(PostRetrieveSerializer().fields))
+
+
+@tag("benchmark")
+class PostValuesSerializerBenchmark(TestCase):
+    page_size = 50
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        author = create_user("author@example.com")
+        Post.objects.bulk_create(
+            Post(author=author, title="Post", slug=f"post-{i}", body="Body " * 100)
+            for i in range(cls.page_size)
+        )
+
+    def test_page_serialization(self) -> None:
+        rows = list(post_values_serializer.values(Post.objects.all()))
+        posts = list(Post.objects.all())
+
+        model = measure(
+            "PostRetrieveSerializer",
+            lambda: PostRetrieveSerializer(posts, many=True).data,
+            repeat=50,
+        )
+        values = measure(
+            "post_values_serializer",
+            lambda: post_values_serializer.many(rows),
+            repeat=50,
+        )
+        report(f"Serializing a page of {self.page_size} posts", model, values)
+
+        self.assertLess(values.median, model.median)
+
+
+class PostSlugTests(TestCase):
+    author: User
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.author = create_user("author@example.com")
+
+    def create_post(self, title: str) -> tuple[Post, list[str]]:
+        with CaptureQueriesContext(connection) as context:
+            post = create_post(self.author, title=title)
+
+        selects = [i["sql"] for i in context.captured_queries if "SELECT" in i["sql"]]
+        return post, selects
+
+    def test_numbers_colliding_titles(self) -> None:
+        slugs = [self.create_post("Same title")[0].slug for _ in range(3)]
+
+        self.assertEqual(slugs, ["same-title", "same-title-2", "same-title-3"])
+
+    def test_resolves_collisions_with_one_query(self) -> None:
+        for _ in range(5):
+            _, selects = self.create_post("Same title")
+            self.assertEqual(len(selects), 1, selects)
+
+    def test_ignores_titles_that_only_share_a_prefix(self) -> None:
+        create_post(self.author, title="Same title again")
+        create_post(self.author, title="Same title-x")
+
+        self.assertEqual(self.create_post("Same title")[0].slug, "same-title")
+
+    def test_keeps_existing_slugs(self) -> None:
+        post = create_post(self.author, title="Old title")
+        post.title = "New title"
+        post.save()
+
+        post.refresh_from_db()
+        self.assertEqual(post.slug, "old-title")
+
+    def test_crops_long_titles_to_fit_the_suffix(self) -> None:
+        title = "Long " * 100
+        first = create_post(self.author, title=title)
+        second = create_post(self.author, title=title)
+
+        self.assertEqual(len(first.slug), get_slug_field().max_length)
+        self.assertEqual(second.slug, f"{first.slug[:-2]}-2")
+
+    def test_retries_a_slug_taken_concurrently(self) -> None:
+        create_post(self.author, title="Same title")
+
+        # As if another request inserted "same-title" after the lookup
+        post = Post(author=self.author, title="Same title", slug="same-title")
+        post.save()
+
+        self.assertEqual(post.slug, "same-title-2")
+
+    def test_generates_unique_slugs_in_bulk(self) -> None:
+        create_post(self.author, title="Same title")
+        posts = [Post(title=i) for i in ("Same title", "Other", "Same title")]
+
+        with CaptureQueriesContext(connection) as context:
+            slugs = generate_unique_slugs(get_slug_field(), posts)
+
+        self.assertEqual(slugs, ["same-title-2", "other", "same-title-3"])
+        self.assertEqual(len(context), 1)
+
+
+@tag("benchmark")
+class PostSlugBenchmark(TestCase):
+    author: User
+    collisions = 5000
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.author = create_user("author@example.com")
+
+    def test_insert_with_colliding_titles(self) -> None:
+        titles = (f"Title {i}" for i in itertools.count())
+        empty = measure(
+            "No colliding posts",
+            lambda: create_post(self.author, title=next(titles)),
+            repeat=50,
+        )
+
+        def insert() -> None:
+            create_post(self.author, title="Same title")
+
+        Post.objects.bulk_create(
+            Post(author=self.author, title="Same title", slug=f"same-title-{i}")
+            for i in range(2, self.collisions + 2)
+        )
+        colliding = measure(f"{self.collisions} colliding posts", insert, repeat=50)
+        report("Inserting a post", empty, colliding)
+
+        self.assertEqual(
+            Post.objects.latest("id").slug, f"same-title-{self.collisions + 51}"
+        )
+
+
+def bleach_clean(text: str) -> str:
+    return str(bleach.clean(text, tags=[], strip=True))
+
+
+class SanitizerTests(TestCase):
+    samples = [
+        "",
+        "Plain text",
+        "Ünïcödé and emoji 🎉",
+        "a < b and c > d",
+        "Fish & chips",
+        "&amp; &lt; &#39; &unknown;",
+        "<b>bold</b> and <i>italic</i>",
+        "<script>alert(1)</script>",
+        '<a href="javascript:alert(1)">link</a>',
+        "<!-- comment -->text",
+        "line\r\nbreak\rcarriage",
+        "tab\tand\nnewline",
+        "null\x00and\x07bell\x1funit",
+        "<<nested>>",
+        "unclosed <b",
+    ]
+
+    def test_strings_match_bleach(self) -> None:
+        for text in self.samples:
+            with self.subTest(text=text):
+                self.assertEqual(sanitize_html_input(text), bleach_clean(text))
+
+    def test_random_strings_match_bleach(self) -> None:
+        alphabet = "ab <>/&;#x\r\n\t\x00\x0b\x1f\"'=!-é"
+        rng = random.Random(0)
+
+        for _ in range(2000):
+            text = "".join(rng.choices(alphabet, k=rng.randint(0, 30)))
+            with self.subTest(text=text):
+                self.assertEqual(sanitize_html_input(text), bleach_clean(text))
+
+    def test_cleans_nested_keys_and_values(self) -> None:
+        data = {
+            "<b>title</b>": "<i>x</i>",
+            "tags": ["<p>a</p>", {"b&c": "d < e"}],
+            "count": 3,
+            "draft": None,
+        }
+
+        self.assertEqual(
+            sanitize_data(data),
+            {
+                "title": "x",
+                "tags": ["a", {"b&amp;c": "d &lt; e"}],
+                "count": 3,
+                "draft": None,
+            },
+        )
+
+    def test_rejects_payloads_nested_too_deep(self) -> None:
+        data: dict = {}
+        for _ in range(5):
+            data = {"a": data}
+
+        with self.assertRaises(ValueError):
+            sanitize_data(data, max_depth=3)
+
+
+@tag("benchmark")
+class SanitizerBenchmark(TestCase):
+    def test_post_payload(self) -> None:
+        data = {
+            "title": "A post title",
+            "body": "Plain paragraph of text. " * 200,
+            "status": "published",
+            "category_id": 1,
+            "tags": [f"tag {i}" for i in range(20)],
+        }
+
+        def clean_with_bleach(obj: object) -> object:
+            if isinstance(obj, str):
+                return bleach_clean(obj)
+            if isinstance(obj, dict):
+                return {bleach_clean(k): clean_with_bleach(v) for k, v in obj.items()}
+            if isinstance(obj, list):
+                return [clean_with_bleach(i) for i in obj]
+            return obj
+
+        baseline = measure("bleach.clean", lambda: clean_with_bleach(data), 50)
+        fast = measure("sanitize_data", lambda: sanitize_data(data), 50)
+        marked = measure(
+            "sanitize_data, with markup",
+            lambda: sanitize_data(data | {"body": "<p>Paragraph</p>" * 200}),
+            50,
+        )
+        report("Sanitizing a post payload", baseline, fast, marked)
+
+        self.assertLess(fast.median, baseline.median)
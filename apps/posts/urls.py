@@ -1,11 +1,12 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import PostViewSet
+from .views import PostExportViewSet, PostViewSet
 
 router = DefaultRouter()
 router.register("", PostViewSet, basename="post")
 
 urlpatterns = [
     path("posts/", include(router.urls)),
+    path("export/posts/", PostExportViewSet.as_view({"get": "list"})),
 ]
@@ -1,10 +1,16 @@
+import time
 from logging import getLogger
 from typing import Any, cast
 
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
+from django.utils.cache import patch_cache_control, patch_response_headers
 from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
-from django_ratelimit.decorators import ratelimit
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from django.utils.functional import cached_property
+from rest_framework.pagination import BasePagination
+from rest_framework.permissions import IsAdminUser, IsAuthenticatedOrReadOnly
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.status import (
@@ -14,46 +20,169 @@ from rest_framework.status import (
 )
 from rest_framework.viewsets import ViewSet
 
+from common.async_views import async_read_view, render_json
+from common.cache import cache_page, get_page_etag, get_page_key, invalidate_tags
 from common.clear_cache import clear_cache
-from common.pagination import CustomPagination
+from common.conditional import (
+    ConditionalState,
+    apply_conditional,
+    conditional,
+    make_etag,
+)
+from common.exceptions import PermissionException
+from common.export import iter_ndjson, ndjson_response
+from common.pagination import CustomPagination, OffsetPagination
+from common.ratelimit import ratelimit
 from common.security import sanitize_data
+from common.serializers import Row
 from settings.base import settings
 
+from .cache import (
+    aget_post_detail,
+    get_post_detail,
+    get_post_list_tag,
+    invalidate_post_detail,
+)
+from .enums import StatusEnum
 from .models import Post
-from .serializers import PostCreateSerializer, PostRetrieveSerializer
+from .search import search_posts
+from .serializers import (
+    PostCreateSerializer,
+    PostRetrieveSerializer,
+    post_values_serializer,
+)
 from .service import PostService
 
 logger = getLogger(__name__)
 
 
+def _get_post_list_tags(response: Response) -> list[str]:
+    # Comments only change the listed posts, see CommentViewSet
+    return [get_post_list_tag(i["id"]) for i in response.data["results"]]
+
+
+def _is_private_list(request: Request) -> bool:
+    # Drafts are per-user, keep them out of the shared page cache
+    return bool(request.query_params.get("status") == StatusEnum.DRAFT)
+
+
+def _make_post_detail_state(entry: dict[str, Any]) -> ConditionalState:
+    data = entry["data"]
+    last_modified = entry["last_modified"]
+    etag = make_etag(
+        data["id"], data["updated_at"], data["comment_count"], last_modified
+    )
+
+    return etag, last_modified
+
+
+def _post_detail_state(_: Request, slug: str) -> ConditionalState:
+    return _make_post_detail_state(get_post_detail(slug))
+
+
+@async_read_view
+async def async_post_list(request: HttpRequest) -> HttpResponse | None:
+    try:
+        # Only validates the filters, drafts need the requesting user and are
+        # refused here
+        PostService.filter_posts(params=request.GET, user=AnonymousUser())
+    except (ValidationError, PermissionException):
+        return None
+
+    entry: dict[str, Any] | None = await cache.aget(
+        get_page_key(settings.redis.prefix.post_list, request)
+    )
+
+    # Misses and stale pages need the sync view to compute or refresh them
+    if entry is None or entry.get("fresh_until", 0) < time.time():
+        return None
+
+    def get_response() -> HttpResponse:
+        response = render_json(entry["data"], entry["status"])
+        patch_response_headers(response, settings.redis.page_timeout)
+        return response
+
+    return apply_conditional(request, (get_page_etag(entry), None), get_response)
+
+
+@async_read_view
+async def async_post_detail(request: HttpRequest, slug: str) -> HttpResponse | None:
+    try:
+        entry = await aget_post_detail(slug)
+    except Post.DoesNotExist:
+        return None
+
+    return apply_conditional(
+        request, _make_post_detail_state(entry), lambda: render_json(entry["data"])
+    )
+
+
 @method_decorator(ratelimit(key="ip", rate="20/m"), name="create")
 class PostViewSet(ViewSet):
     lookup_field = "slug"
     permission_classes = [IsAuthenticatedOrReadOnly]
-    paginator = CustomPagination()
+
+    @cached_property
+    def paginator(self) -> CustomPagination:
+        return CustomPagination()
+
+    @cached_property
+    def search_paginator(self) -> OffsetPagination:
+        return OffsetPagination()
 
     def _clear_cache(self) -> None:
         clear_cache(settings.redis.prefix.post_list)
         logger.debug("Cache cleared, prefix %s", settings.redis.prefix.post_list)
 
-    @method_decorator(cache_page(60, key_prefix=settings.redis.prefix.post_list))
+    @method_decorator(
+        cache_page(
+            settings.redis.page_timeout,
+            key_prefix=settings.redis.prefix.post_list,
+            response_tags=_get_post_list_tags,
+            skip_cache=_is_private_list,
+        )
+    )
     def list(self, request: Request) -> Response:
-        posts = cast(
-            list[Post],
-            self.paginator.paginate_queryset(Post.objects.all(), request=request),
+        queryset = PostService.filter_posts(
+            params=request.query_params, user=request.user
+        )
+        paginator: BasePagination = self.paginator
+
+        if query := request.query_params.get("q", "").strip():
+            if len(query) > settings.post.search_query_max_length:
+                raise ValidationError(
+                    "Search query must not exceed "
+                    f"{settings.post.search_query_max_length} characters"
+                )
+            logger.debug("Searching posts, q: %r", query)
+
+            # Relevance ordering can't be keyset-paginated
+            queryset = search_posts(queryset, query)
+            paginator = self.search_paginator
+
+        rows = cast(
+            list[Row],
+            paginator.paginate_queryset(
+                post_values_serializer.values(queryset), request=request
+            ),
         )
 
         if settings.log.debug_allowed:
-            logger.debug("Found %d posts", len(posts))
+            logger.debug("Found %d posts", len(rows))
 
-        result = PostRetrieveSerializer(posts, many=True).data
-        return self.paginator.get_paginated_response(result)
+        result = post_values_serializer.many(rows)
+        response = paginator.get_paginated_response(result)
 
+        if _is_private_list(request):
+            patch_cache_control(response, private=True)
+
+        return response
+
+    @method_decorator(conditional(_post_detail_state))
     def retrieve(self, _: Request, slug: str) -> Response:
         logger.debug("Fetching post, slug: %r", slug)
-        post = Post.objects.get(slug=slug)
 
-        return Response(PostRetrieveSerializer(post).data, HTTP_200_OK)
+        return Response(get_post_detail(slug)["data"], HTTP_200_OK)
 
     def create(self, request: Request) -> Response:
         if settings.log.debug_allowed:
@@ -69,6 +198,7 @@ class PostViewSet(ViewSet):
         logger.info("Post created, id: %s", post.id)
 
         self._clear_cache()
+        invalidate_post_detail(post.slug)
 
         return Response(PostRetrieveSerializer(post).data, status=HTTP_201_CREATED)
 
@@ -96,6 +226,7 @@ class PostViewSet(ViewSet):
         logger.info("Post updated")
 
         self._clear_cache()
+        invalidate_post_detail(slug, post.slug)
 
         return Response(PostRetrieveSerializer(post).data, status=HTTP_200_OK)
 
@@ -112,5 +243,22 @@ class PostViewSet(ViewSet):
         logger.info("Post deleted")
 
         self._clear_cache()
+        invalidate_post_detail(slug)
+        invalidate_tags(f"{settings.redis.prefix.comment_list}.{slug}")
 
         return Response(status=HTTP_204_NO_CONTENT)
+
+
+class PostExportViewSet(ViewSet):
+    permission_classes = [IsAdminUser]
+
+    def list(self, request: Request) -> StreamingHttpResponse:
+        logger.info("Exporting posts")
+
+        return ndjson_response(
+            request,
+            iter_ndjson(
+                Post.objects.all(), post_values_serializer, settings.export.chunk_size
+            ),
+            filename="posts.ndjson",
+        )
@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class UsersConfig(AppConfig):
     name = "apps.users"
+
+    def ready(self) -> None:
+        from .signals import user_changed_handler  # noqa: F401
+
+        return super().ready()
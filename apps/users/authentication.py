@@ -0,0 +1,97 @@
+import copy
+import hashlib
+from logging import getLogger
+
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+    TokenError,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+
+from django.utils.translation import gettext as _
+
+from common.lru import ExpiringLRU
+from settings.conf import settings
+
+from .cache import get_user
+from .models import User
+
+logger = getLogger(__name__)
+
+_validated_tokens = ExpiringLRU(settings.auth.jwt.validated_cache_size)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    ``JWTAuthentication`` that verifies the RS256 signature of a token once
+    per process and keeps the validated token until its ``exp``.
+
+    Entries are keyed by the SHA-256 of the raw token, so a token is only
+    trusted if it's byte for byte the one that passed verification. Token
+    classes with a blacklist are still checked against it on every request.
+
+    Users are read through ``apps.users.cache`` instead of a query per
+    request, with only the fields authentication needs loaded. Saves,
+    deletes and ``QuerySet.update`` of users invalidate the entry.
+    """
+
+    def get_validated_token(self, raw_token: bytes) -> Token:
+        digest = hashlib.sha256(raw_token).digest()
+        token: Token = _validated_tokens.get(digest)
+
+        if token is ExpiringLRU.MISSING:
+            token = super().get_validated_token(raw_token)
+            _validated_tokens.set(digest, token, token["exp"])
+        elif check_blacklist := getattr(token, "check_blacklist", None):
+            try:
+                check_blacklist()
+            except TokenError as e:
+                # Same error as the uncached path, a 401 instead of a 500
+                raise InvalidToken(
+                    {
+                        "detail": _("Given token not valid for any token type"),
+                        "messages": [
+                            {
+                                "token_class": type(token).__name__,
+                                "token_type": token.token_type,
+                                "message": e.args[0],
+                            }
+                        ],
+                    }
+                ) from e
+
+        # Callers may modify the payload, the cached token stays as verified
+        token = copy.copy(token)
+        token.payload = dict(token.payload)
+
+        return token
+
+    def get_user(self, validated_token: Token) -> User:  # type: ignore[override]
+        # JWTAuthentication.get_user with the user read from the cache
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from e
+
+        try:
+            user, password_digest = get_user(user_id)
+        except User.DoesNotExist as e:
+            raise AuthenticationFailed(
+                _("User not found"), code="user_not_found"
+            ) from e
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != password_digest:
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
@@ -0,0 +1,59 @@
+from logging import getLogger
+from typing import Any
+from uuid import UUID
+
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from django.core.cache import cache
+
+from settings.conf import settings
+
+from .models import User
+
+logger = getLogger(__name__)
+
+# Read by authentication and the permission checks. The other fields are
+# deferred on the cached user and loaded from the database on access
+_CACHED_FIELDS = frozenset(("id", "email", "is_active", "is_staff", "is_superuser"))
+
+# Model.from_db() takes the values in the model's field order
+_field_names = [
+    i.attname for i in User._meta.concrete_fields if i.attname in _CACHED_FIELDS
+]
+
+
+def get_user_key(user_id: UUID | str) -> str:
+    # Not the key whole users were pickled under, those entries can't be read
+    return f"{settings.redis.prefix.user}.auth.{user_id}"
+
+
+def get_user(user_id: UUID | str) -> tuple[User, str]:
+    """
+    Read-through cache of the user fields authentication needs, kept
+    ``settings.redis.user_timeout``.
+
+    Returns the user and the digest of its password hash that tokens carry
+    when they're revoked on password changes. The hash itself isn't cached.
+
+    :raises User.DoesNotExist:
+    """
+    key = get_user_key(user_id)
+    entry: dict[str, Any] | None = cache.get(key)
+
+    if entry is None:
+        row = User.objects.values(*_field_names, "password").get(id=user_id)
+        entry = {
+            "values": [row[i] for i in _field_names],
+            "password_digest": get_md5_hash_password(row["password"]),
+        }
+        cache.set(key, entry, settings.redis.user_timeout)
+        logger.debug("User cache miss, user_id: %s", user_id)
+
+    user = User.from_db(User.objects.db, _field_names, entry["values"])
+
+    return user, entry["password_digest"]
+
+
+def invalidate_user(*user_ids: Any) -> None:
+    cache.delete_many([get_user_key(i) for i in set(user_ids)])
+    logger.debug("User cache invalidated, user_ids: %s", user_ids)
@@ -0,0 +1,40 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+from settings.conf import settings
+
+# Argon2 allocates memory_cost KiB per hash, so concurrent hashes are capped
+# per process rather than queued on the CPU
+_hashing_slots = threading.BoundedSemaphore(settings.auth.password.hash_concurrency)
+
+# Runs login and registration under ASGI, see settings.urls_asgi, so hashing
+# never occupies the thread the other sync views share
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.auth.password.hash_concurrency,
+    thread_name_prefix="password-hash",
+)
+
+
+class LimitedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2 with the costs of ``settings.auth.password`` and at most
+    ``hash_concurrency`` hashes computed at once.
+
+    Hashes made with other costs still verify and are rehashed on the next
+    successful login, see ``must_update``.
+    """
+
+    time_cost = settings.auth.password.argon2_time_cost
+    memory_cost = settings.auth.password.argon2_memory_cost
+    parallelism = settings.auth.password.argon2_parallelism
+
+    def encode(self, password: Any, salt: Any) -> str:
+        with _hashing_slots:
+            return super().encode(password, salt)
+
+    def verify(self, password: Any, encoded: str) -> bool:
+        with _hashing_slots:
+            return super().verify(password, encoded)
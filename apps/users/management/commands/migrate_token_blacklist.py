@@ -0,0 +1,78 @@
+from logging import getLogger
+from typing import Any
+
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.utils import timezone
+
+from apps.users.tokens import get_blacklist_key
+from settings.conf import redis_client, settings
+
+logger = getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy unexpired blacklisted refresh tokens from the token_blacklist "
+        "tables to Redis, run before switching BLOG_JWT_TOKEN_STORE to redis "
+        "and once more after the switch"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--delete",
+            action="store_true",
+            help=(
+                "Delete the copied rows and all expired ones from the tables, "
+                "only once BLOG_JWT_TOKEN_STORE is redis"
+            ),
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        batch_size: int = options["batch_size"]
+
+        # While the tables are still the blacklist, deleting from them would
+        # make revoked refresh tokens usable again
+        if options["delete"] and settings.auth.jwt.token_store != "redis":
+            raise CommandError("--delete requires BLOG_JWT_TOKEN_STORE=redis")
+
+        now = timezone.now()
+
+        rows = (
+            BlacklistedToken._default_manager.filter(token__expires_at__gt=now)
+            .order_by("id")
+            .values_list("id", "token__jti", "token__expires_at")
+        )
+
+        last_id = 0
+        copied = 0
+
+        while batch := list(rows.filter(id__gt=last_id)[:batch_size]):
+            last_id = batch[-1][0]
+
+            with redis_client.pipeline(transaction=False) as pipe:
+                for _, jti, expires_at in batch:
+                    pipe.set(
+                        get_blacklist_key(jti), 1, exat=int(expires_at.timestamp())
+                    )
+                pipe.execute()
+
+            copied += len(batch)
+            logger.info("Copied %d blacklisted tokens", copied)
+
+        self.stdout.write(f"Copied {copied} blacklisted tokens to Redis")
+
+        if options["delete"]:
+            # Blacklisted rows go with their outstanding tokens
+            deleted, _ = OutstandingToken._default_manager.filter(
+                expires_at__lte=now
+            ).delete()
+            deleted += BlacklistedToken._default_manager.filter(
+                id__lte=last_id
+            ).delete()[0]
+            self.stdout.write(f"Deleted {deleted} rows")
@@ -13,14 +13,34 @@ from django.db.models import (
     DateTimeField,
     EmailField,
     ImageField,
+    QuerySet,
     UUIDField,
 )
+from django.dispatch import Signal
 from django.utils import timezone
 
 from settings.conf import settings
 
+# Sent with the ``user_ids`` of rows changed by ``QuerySet.update``, which
+# post_save isn't sent for
+users_updated = Signal()
+
+
+class UserQuerySet(QuerySet["User"]):
+    def update(self, **kwargs: Any) -> int:
+        user_ids = list(self.values_list("pk", flat=True))
+        updated = super().update(**kwargs)
+
+        if user_ids:
+            users_updated.send(sender=self.model, user_ids=user_ids)
+
+        return updated
+
 
 class UserManager(BaseUserManager["User"]):
+    def get_queryset(self) -> UserQuerySet:
+        return UserQuerySet(self.model, using=self._db)
+
     def create_user(
         self,
         email: str,
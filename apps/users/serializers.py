@@ -1,6 +1,18 @@
-from rest_framework.serializers import ModelSerializer
+from typing import Any
+
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+    TokenVerifySerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import UntypedToken
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework.serializers import ModelSerializer, ValidationError
 
 from .models import User
+from .tokens import RedisRefreshToken, is_blacklisted
 
 
 class UserCreateSerializer(ModelSerializer):
@@ -35,3 +47,23 @@ class UserRetrieveSerializer(ModelSerializer):
             "is_staff",
             "avatar",
         )
+
+
+class RedisTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = RedisRefreshToken
+
+
+class RedisTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = RedisRefreshToken
+
+
+class RedisTokenVerifySerializer(TokenVerifySerializer):
+    def validate(self, attrs: dict[str, Any]) -> dict[Any, Any]:
+        token = UntypedToken(attrs["token"])
+
+        if api_settings.BLACKLIST_AFTER_ROTATION and is_blacklisted(
+            token.get(api_settings.JTI_CLAIM)
+        ):
+            raise ValidationError(_("Token is blacklisted"))
+
+        return {}
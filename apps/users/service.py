@@ -1,8 +1,11 @@
+import math
+import string
 from logging import getLogger
 from typing import Any, Iterable
 
 from PIL import Image, UnidentifiedImageError
 from zxcvbn import zxcvbn
+from zxcvbn.frequency_lists import FREQUENCY_LISTS
 
 from django.core.exceptions import ValidationError
 from django.core.files.base import File
@@ -18,6 +21,19 @@ logger = getLogger(__name__)
 
 email_validator = EmailValidator()
 
+# log2 of the 10 guesses zxcvbn charges per brute forced character
+_BITS_PER_CHARACTER = 3.32
+
+# Rank of each password in zxcvbn's list, the guesses its dictionary match takes
+_COMMON_PASSWORDS = {i: rank for rank, i in enumerate(FREQUENCY_LISTS["passwords"], 1)}
+
+_CHARACTER_CLASSES = (
+    frozenset(string.ascii_lowercase),
+    frozenset(string.ascii_uppercase),
+    frozenset(string.digits),
+)
+_ASCII_ALPHANUMERIC = frozenset(string.ascii_letters + string.digits)
+
 
 class UserService:
     def create_user(self, data: dict[str, Any]) -> User:
@@ -74,6 +90,10 @@ class UserService:
         """
         Validates password strength and complexity.
 
+        Cheap bounds run first: length, character classes and the common
+        passwords. zxcvbn only rates the first
+        ``settings.auth.password.zxcvbn_window`` characters.
+
         :param password: Password to validate
         :param user_inputs: User-related strings to check against
         :raises ValidationError: If password is too short, too long, or too weak
@@ -89,10 +109,42 @@ class UserService:
                 f"{settings.auth.password.max_length} characters"
             )
 
-        result = zxcvbn(password, user_inputs=user_inputs)
-        entropy = result["guesses_log10"] * 3.32
+        min_classes = settings.auth.password.min_character_classes
+        if self._count_character_classes(password) < min_classes:
+            raise ValidationError(
+                f"Password must contain at least {min_classes} of: lowercase "
+                "letters, uppercase letters, digits and other characters"
+            )
+
+        min_entropy = settings.auth.password.min_entropy
+        checked = password[: settings.auth.password.zxcvbn_window]
+
+        # zxcvbn never rates a character above a brute force guess, so short
+        # passwords are rejected without running it
+        max_entropy = len(checked) * _BITS_PER_CHARACTER
+        if max_entropy < min_entropy:
+            raise self._weak_password_error(
+                max_entropy, "Add another word or two. Uncommon words are better."
+            )
+
+        user_inputs = list(user_inputs)
+        lowered = password.lower()
+
+        if rank := _COMMON_PASSWORDS.get(lowered):
+            raise self._weak_password_error(
+                math.log2(rank), "This is a very common password."
+            )
+
+        if lowered in {i.lower() for i in user_inputs}:
+            raise self._weak_password_error(
+                0.0, "Avoid your name or email address in the password."
+            )
+
+        # zxcvbn's cost grows steeply with length, only a prefix is rated
+        result = zxcvbn(checked, user_inputs=user_inputs)
+        entropy = result["guesses_log10"] * _BITS_PER_CHARACTER
 
-        if entropy < settings.auth.password.min_entropy:
+        if entropy < min_entropy:
             feedback_msg = ""
 
             if result["feedback"]["warning"]:
@@ -101,11 +153,24 @@ class UserService:
             if result["feedback"]["suggestions"]:
                 feedback_msg += " " + " ".join(result["feedback"]["suggestions"])
 
-            raise ValidationError(
-                "Weak password, password strength is "
-                f"({entropy:.1f} bits, minimum {settings.auth.password.min_entropy}). "
-                f"{feedback_msg}"
-            )
+            raise self._weak_password_error(entropy, feedback_msg)
+
+    def _count_character_classes(self, password: str) -> int:
+        characters = set(password)
+        classes = sum(1 for i in _CHARACTER_CLASSES if characters & i)
+
+        # Symbols, whitespace and non-ASCII letters count as one class
+        if characters - _ASCII_ALPHANUMERIC:
+            classes += 1
+
+        return classes
+
+    def _weak_password_error(self, entropy: float, feedback: str) -> ValidationError:
+        return ValidationError(
+            "Weak password, password strength is "
+            f"({entropy:.1f} bits, minimum {settings.auth.password.min_entropy}). "
+            f"{feedback}"
+        )
 
     def _validate_first_name(self, value: str) -> None:
         """Validates first name length."""
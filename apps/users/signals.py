@@ -0,0 +1,28 @@
+from functools import partial
+from logging import getLogger
+from typing import Any
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_user
+from .models import User, users_updated
+
+logger = getLogger(__name__)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed_handler(sender: type[User], instance: User, **kwargs: Any):
+    # A request racing the transaction could cache the old row again before
+    # the commit, so it's dropped once more after it
+    invalidate_user(instance.pk)
+    transaction.on_commit(partial(invalidate_user, instance.pk))
+
+
+@receiver(users_updated, sender=User)
+def users_updated_handler(sender: type[User], user_ids: list[Any], **kwargs: Any):
+    # E.g. User.objects.filter(...).update(is_active=False)
+    invalidate_user(*user_ids)
+    transaction.on_commit(partial(invalidate_user, *user_ids))
@@ -1 +1,705 @@
-# Create your tests here.
+import asyncio
+import io
+import json
+import string
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from rest_framework_simplejwt import authentication as jwt_authentication
+from rest_framework_simplejwt import tokens as jwt_tokens
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken, SlidingToken
+from rest_framework_simplejwt.views import (
+    TokenObtainPairView,
+    TokenRefreshView,
+    TokenVerifyView,
+)
+from zxcvbn import zxcvbn
+
+from django.contrib.auth.hashers import Argon2PasswordHasher, make_password
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.http import HttpRequest, HttpResponse
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, tag
+from django.test.client import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django_ratelimit.exceptions import Ratelimited
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from common.lru import ExpiringLRU
+from common.ratelimit import is_ratelimited, parse_rate, ratelimit
+from common.testing import Timing, asgi_request, measure, report
+from settings.asgi import application
+from settings.conf import redis_client, settings
+
+from . import authentication
+from .authentication import CachedJWTAuthentication, _validated_tokens
+from .cache import get_user
+from .hashers import LimitedArgon2PasswordHasher
+from .models import User
+from .serializers import (
+    RedisTokenObtainPairSerializer,
+    RedisTokenRefreshSerializer,
+    RedisTokenVerifySerializer,
+)
+from .service import user_service
+from .tokens import RedisRefreshToken, blacklist_jti, get_blacklist_key, is_blacklisted
+
+
+def create_user(email: str, password: str = "Correct-Horse-9") -> User:
+    return User.objects.create_user(
+        email=email, first_name="Test", last_name="User", raw_password=password
+    )
+
+
+class RateLimitTests(APITestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
+    def register(self, ip: str = "10.0.0.1") -> int:
+        response = self.client.post("/api/auth/register/", {}, REMOTE_ADDR=ip)
+
+        if response.status_code == 429:
+            self.assertGreaterEqual(int(response["Retry-After"]), 1)
+
+        status: int = response.status_code
+        return status
+
+    def test_limits_registrations_per_ip(self) -> None:
+        statuses = [self.register() for _ in range(5)]
+        self.assertNotIn(429, statuses)
+
+        with self.assertLogs("middleware.exception_handlers", "WARNING"):
+            self.assertEqual(self.register(), 429)
+
+        self.assertNotEqual(self.register("10.0.0.2"), 429)
+
+    def test_allows_at_most_the_limit_in_any_window(self) -> None:
+        limit, period = 5, 1
+        value = uuid.uuid4().hex
+        allowed = []
+        end = time.monotonic() + period * 2.5
+
+        while (now := time.monotonic()) < end:
+            if not is_ratelimited("test", value, limit, period):
+                allowed.append(now)
+            time.sleep(0.01)
+
+        # Twice the limit would pass at the edges of a fixed window or GCRA
+        self.assertGreaterEqual(len(allowed), limit * 2)
+        for i, start in enumerate(allowed):
+            # Less than a period, the local clock isn't the Redis one
+            in_window = [j for j in allowed[i:] if j - start < period - 0.05]
+            self.assertLessEqual(len(in_window), limit, allowed)
+
+    def test_counts_only_the_limited_methods(self) -> None:
+        @ratelimit(key="ip", rate="1/m", method="POST")
+        def view(request: HttpRequest) -> HttpResponse:
+            return HttpResponse()
+
+        factory = RequestFactory()
+        for _ in range(3):
+            view(factory.get("/"))
+
+        view(factory.post("/"))
+        with self.assertRaises(Ratelimited) as context:
+            view(factory.post("/"))
+
+        self.assertGreaterEqual(context.exception.retry_after, 1)  # type: ignore
+
+
+class ParseRateTests(SimpleTestCase):
+    def test_parses_rates(self) -> None:
+        self.assertEqual(parse_rate("5/m"), (5, 60))
+        self.assertEqual(parse_rate("100/10m"), (100, 600))
+        self.assertEqual(parse_rate("1/d"), (1, 24 * 60 * 60))
+
+    def test_rejects_malformed_rates(self) -> None:
+        for rate in ("", "5", "5/w", "x/m", "5/xm"):
+            with self.subTest(rate=rate), self.assertRaises(ValueError):
+                parse_rate(rate)
+
+
+class ExpiringLRUTests(SimpleTestCase):
+    def test_expires_entries_at_their_time(self) -> None:
+        lru = ExpiringLRU(10)
+        lru.set("key", "value", time.time() + 60)
+
+        self.assertEqual(lru.get("key"), "value")
+
+        with mock.patch("common.lru.time.time", return_value=time.time() + 61):
+            self.assertIs(lru.get("key"), ExpiringLRU.MISSING)
+
+        self.assertEqual(len(lru), 0)
+
+    def test_evicts_the_least_recently_used(self) -> None:
+        lru = ExpiringLRU(2)
+        expires_at = time.time() + 60
+        lru.set("a", 1, expires_at)
+        lru.set("b", 2, expires_at)
+        lru.get("a")
+        lru.set("c", 3, expires_at)
+
+        self.assertIs(lru.get("b"), ExpiringLRU.MISSING)
+        self.assertEqual((lru.get("a"), lru.get("c")), (1, 3))
+
+
+class CachedJWTAuthenticationTests(APITestCase):
+    user: User
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = create_user("user@example.com")
+
+    def setUp(self) -> None:
+        cache.clear()
+        _validated_tokens.clear()
+
+    def get_drafts(self, token: object) -> int:
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        status: int = self.client.get("/api/posts/", {"status": "draft"}).status_code
+        return status
+
+    def test_verifies_a_token_once(self) -> None:
+        token = RefreshToken.for_user(self.user).access_token
+
+        with mock.patch.object(
+            JWTAuthentication,
+            "get_validated_token",
+            autospec=True,
+            side_effect=JWTAuthentication.get_validated_token,
+        ) as get_validated_token:
+            self.assertEqual([self.get_drafts(token) for _ in range(3)], [200] * 3)
+
+        self.assertEqual(get_validated_token.call_count, 1)
+
+    def test_refuses_a_tampered_token(self) -> None:
+        token = str(RefreshToken.for_user(self.user).access_token)
+        self.assertEqual(self.get_drafts(token), 200)
+
+        header, payload, signature = token.split(".")
+        tampered = f"{header}.{payload}.{signature[:-4]}AAAA"
+
+        self.assertEqual(self.get_drafts(tampered), 401)
+
+    def test_refuses_a_cached_token_after_its_expiry(self) -> None:
+        token = RefreshToken.for_user(self.user).access_token
+        self.assertEqual(self.get_drafts(token), 200)
+
+        expired = token["exp"] + 1
+        with mock.patch("common.lru.time.time", return_value=expired):
+            with mock.patch("rest_framework_simplejwt.tokens.aware_utcnow") as now:
+                now.return_value = datetime.fromtimestamp(expired, timezone.utc)
+                self.assertEqual(self.get_drafts(token), 401)
+
+    @mock.patch.object(
+        jwt_authentication.api_settings, "AUTH_TOKEN_CLASSES", (SlidingToken,)
+    )
+    def test_refuses_a_cached_token_once_blacklisted(self) -> None:
+        token = SlidingToken.for_user(self.user)
+        self.assertEqual(self.get_drafts(token), 200)
+
+        token.blacklist()
+
+        self.assertEqual(self.get_drafts(token), 401)
+
+    def test_keeps_the_cached_payload_unchanged(self) -> None:
+        raw_token = str(RefreshToken.for_user(self.user).access_token).encode()
+        auth = CachedJWTAuthentication()
+
+        auth.get_validated_token(raw_token).payload["user_id"] = "other"
+
+        self.assertEqual(
+            auth.get_validated_token(raw_token)["user_id"],
+            str(self.user.pk),
+        )
+
+
+class UserCacheTests(APITestCase):
+    user: User
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = create_user("user@example.com")
+
+    def setUp(self) -> None:
+        cache.clear()
+        _validated_tokens.clear()
+
+    def authenticate(self) -> None:
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def get_drafts(self) -> int:
+        status: int = self.client.get("/api/posts/", {"status": "draft"}).status_code
+        return status
+
+    def test_reads_the_user_once(self) -> None:
+        get_user(self.user.pk)
+
+        with CaptureQueriesContext(connection) as context:
+            user, _ = get_user(self.user.pk)
+
+        self.assertEqual(len(context), 0)
+        self.assertEqual((user.pk, user.email), (self.user.pk, self.user.email))
+
+    def test_loads_deferred_fields_on_access(self) -> None:
+        user, _ = get_user(self.user.pk)
+
+        self.assertIn("first_name", user.get_deferred_fields())
+        self.assertEqual(user.first_name, self.user.first_name)
+
+    def test_drops_the_user_on_save(self) -> None:
+        self.authenticate()
+        self.assertEqual(self.get_drafts(), 200)
+
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertEqual(self.get_drafts(), 401)
+
+    def test_drops_the_user_on_queryset_update(self) -> None:
+        self.authenticate()
+        self.assertEqual(self.get_drafts(), 200)
+
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        self.assertEqual(self.get_drafts(), 401)
+
+    def test_refuses_tokens_issued_before_a_password_change(self) -> None:
+        with (
+            mock.patch.object(jwt_tokens.api_settings, "CHECK_REVOKE_TOKEN", True),
+            mock.patch.object(authentication.api_settings, "CHECK_REVOKE_TOKEN", True),
+        ):
+            self.authenticate()
+            self.assertEqual(self.get_drafts(), 200)
+
+            self.user.set_password("Other-Horse-10")
+            self.user.save()
+
+            self.assertEqual(self.get_drafts(), 401)
+
+    def test_saves_profile_changes_without_losing_fields(self) -> None:
+        self.client.force_authenticate(get_user(self.user.pk)[0])
+
+        response = self.client.patch("/api/users/me/", {"first_name": "New"})
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.first_name, self.user.last_name), ("New", "User"))
+
+
+@tag("benchmark")
+class CachedJWTAuthenticationBenchmark(TestCase):
+    def test_authentication_per_request(self) -> None:
+        token = AccessToken.for_user(create_user("user@example.com"))
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+
+        cache.clear()
+        _validated_tokens.clear()
+
+        plain = measure(
+            "JWTAuthentication",
+            lambda: JWTAuthentication().authenticate(request),  # type: ignore
+            repeat=200,
+        )
+        cached = measure(
+            "CachedJWTAuthentication",
+            lambda: CachedJWTAuthentication().authenticate(request),  # type: ignore
+            repeat=200,
+        )
+        report("Authenticating a request with an RS256 token", plain, cached)
+
+        self.assertLess(cached.median, plain.median)
+
+
+# The token views read their serializers from SIMPLE_JWT at import time
+obtain_view = TokenObtainPairView.as_view(
+    serializer_class=RedisTokenObtainPairSerializer
+)
+refresh_view = TokenRefreshView.as_view(serializer_class=RedisTokenRefreshSerializer)
+verify_view = TokenVerifyView.as_view(serializer_class=RedisTokenVerifySerializer)
+
+
+class RedisTokenStoreTests(APITestCase):
+    user: User
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = create_user("user@example.com")
+
+    def post(self, view: Callable, data: dict[str, str]) -> tuple[int, dict]:
+        response = view(APIRequestFactory().post("/", data, format="json"))
+
+        return response.status_code, response.data
+
+    def refresh(self, token: str) -> tuple[int, dict]:
+        return self.post(refresh_view, {"refresh": token})
+
+    def test_rotates_refresh_tokens_once(self) -> None:
+        status, tokens = self.post(
+            obtain_view,
+            {"email": self.user.email, "password": "Correct-Horse-9"},
+        )
+        self.assertEqual(status, 200, tokens)
+
+        status, rotated = self.refresh(tokens["refresh"])
+        self.assertEqual(status, 200, rotated)
+        self.assertNotEqual(rotated["refresh"], tokens["refresh"])
+
+        self.assertEqual(self.refresh(tokens["refresh"])[0], 401)
+        self.assertEqual(self.refresh(rotated["refresh"])[0], 200)
+
+    def test_keeps_no_outstanding_tokens(self) -> None:
+        self.refresh(str(RedisRefreshToken.for_user(self.user)))
+
+        self.assertFalse(OutstandingToken._default_manager.exists())
+
+    def test_refuses_blacklisted_tokens_on_verify(self) -> None:
+        token = RedisRefreshToken.for_user(self.user)
+        self.assertEqual(self.post(verify_view, {"token": str(token)})[0], 200)
+
+        token.blacklist()
+
+        self.assertEqual(self.post(verify_view, {"token": str(token)})[0], 400)
+
+    def test_refuses_a_concurrent_second_rotation(self) -> None:
+        token = RedisRefreshToken.for_user(self.user)
+        token.blacklist()
+
+        with self.assertRaises(TokenError):
+            token.blacklist()
+
+    def test_blacklists_until_the_token_expires(self) -> None:
+        jti = uuid.uuid4().hex
+        exp = int(time.time()) + 60
+
+        self.assertTrue(blacklist_jti(jti, exp))
+        self.assertFalse(blacklist_jti(jti, exp))
+        self.assertTrue(is_blacklisted(jti))
+        self.assertLessEqual(redis_client.ttl(get_blacklist_key(jti)), 60)
+
+    def test_skips_expired_tokens(self) -> None:
+        jti = uuid.uuid4().hex
+
+        self.assertTrue(blacklist_jti(jti, int(time.time()) - 1))
+        self.assertFalse(is_blacklisted(jti))
+
+    def test_migrates_the_blacklist_tables(self) -> None:
+        token = RefreshToken.for_user(self.user)
+        token.blacklist()
+
+        with mock.patch.object(settings.auth.jwt, "token_store", "redis"):
+            call_command("migrate_token_blacklist", "--delete", stdout=io.StringIO())
+
+        self.assertTrue(is_blacklisted(token["jti"]))
+        self.assertEqual(self.refresh(str(token))[0], 401)
+        self.assertFalse(BlacklistedToken._default_manager.exists())
+
+    def test_keeps_the_blacklist_tables_while_they_are_in_use(self) -> None:
+        RefreshToken.for_user(self.user).blacklist()
+
+        with (
+            mock.patch.object(settings.auth.jwt, "token_store", "db"),
+            self.assertRaises(CommandError),
+        ):
+            call_command("migrate_token_blacklist", "--delete", stdout=io.StringIO())
+
+        self.assertTrue(BlacklistedToken._default_manager.exists())
+
+
+@tag("benchmark")
+class TokenRefreshBenchmark(TestCase):
+    def test_refresh_rotation(self) -> None:
+        user = create_user("user@example.com")
+
+        def rotate(serializer_class: type, token: RefreshToken) -> Callable[[], None]:
+            refresh = str(token)
+
+            def run() -> None:
+                nonlocal refresh
+                serializer = serializer_class(data={"refresh": refresh})
+                serializer.is_valid(raise_exception=True)
+                refresh = serializer.validated_data["refresh"]
+
+            return run
+
+        tables = measure(
+            "token_blacklist tables",
+            rotate(TokenRefreshSerializer, RefreshToken.for_user(user)),
+            repeat=200,
+        )
+        redis = measure(
+            "Redis",
+            rotate(RedisTokenRefreshSerializer, RedisRefreshToken.for_user(user)),
+            repeat=200,
+        )
+        report("Rotating a refresh token", tables, redis)
+
+
+class CheapArgon2PasswordHasher(Argon2PasswordHasher):
+    time_cost = 1
+    memory_cost = 1024
+    parallelism = 1
+
+
+class LimitedArgon2PasswordHasherTests(APITestCase):
+    def test_uses_the_configured_costs(self) -> None:
+        hasher = LimitedArgon2PasswordHasher()
+        params = hasher.params()
+
+        self.assertEqual(params.time_cost, settings.auth.password.argon2_time_cost)
+        self.assertEqual(params.memory_cost, settings.auth.password.argon2_memory_cost)
+        self.assertEqual(params.parallelism, settings.auth.password.argon2_parallelism)
+
+    def test_bounds_concurrent_hashes(self) -> None:
+        lock = threading.Lock()
+        active = peak = 0
+
+        def encode(*args: object) -> str:
+            nonlocal active, peak
+
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.02)
+            with lock:
+                active -= 1
+
+            return ""
+
+        limit = settings.auth.password.hash_concurrency
+        hasher = LimitedArgon2PasswordHasher()
+
+        with mock.patch.object(Argon2PasswordHasher, "encode", side_effect=encode):
+            threads = [
+                threading.Thread(target=hasher.encode, args=("password", "salt"))
+                for _ in range(limit * 3)
+            ]
+            for i in threads:
+                i.start()
+            for i in threads:
+                i.join()
+
+        self.assertEqual(peak, limit)
+
+    def test_rehashes_on_login_when_costs_change(self) -> None:
+        user = create_user("user@example.com")
+        old_hash = make_password("Correct-Horse-9", hasher=CheapArgon2PasswordHasher())
+        User.objects.filter(pk=user.pk).update(password=old_hash)
+
+        response = self.client.post(
+            "/api/auth/token/",
+            {"email": user.email, "password": "Correct-Horse-9"},
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+
+        user.refresh_from_db()
+        self.assertNotEqual(user.password, old_hash)
+        self.assertFalse(LimitedArgon2PasswordHasher().must_update(user.password))
+        self.assertTrue(user.check_password("Correct-Horse-9"))
+
+
+class PasswordOffloadTests(TransactionTestCase):
+    async def test_hashes_asgi_logins_in_the_password_executor(self) -> None:
+        user = await User.objects.acreate(email="user@example.com")
+        await sync_to_async(user.set_password)("Correct-Horse-9")
+        await user.asave()
+
+        threads = []
+        verify = LimitedArgon2PasswordHasher.verify
+
+        def record_thread(self: LimitedArgon2PasswordHasher, *args: Any) -> bool:
+            threads.append(threading.current_thread().name)
+            return verify(self, *args)
+
+        body = {"email": user.email, "password": "Correct-Horse-9"}
+        with mock.patch.object(LimitedArgon2PasswordHasher, "verify", record_thread):
+            status, content = await asgi_request(
+                application, "POST", "/api/auth/token/", json.dumps(body).encode()
+            )
+
+        self.assertEqual(status, 200, content)
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads[0].startswith("password-hash"), threads)
+
+
+@tag("benchmark")
+class MixedTrafficBenchmark(TransactionTestCase):
+    """Read latency under ASGI while a burst of logins is hashing."""
+
+    logins = 8
+
+    async def read(self, app: ASGIHandler, token: str) -> float:
+        start = time.perf_counter()
+        status, content = await asgi_request(
+            app,
+            "GET",
+            "/api/posts/?status=draft",
+            headers={"authorization": f"Bearer {token}"},
+        )
+        self.assertEqual(status, 200, content)
+
+        return time.perf_counter() - start
+
+    async def measure_reads(self, name: str, app: ASGIHandler, token: str) -> Timing:
+        """Times reads for as long as a burst of logins is running."""
+        body = json.dumps({"email": "user@example.com", "password": "Correct-Horse-9"})
+        tasks = [
+            asyncio.create_task(
+                asgi_request(app, "POST", "/api/auth/token/", body.encode())
+            )
+            for _ in range(self.logins)
+        ]
+        # Lets the logins start before the first read
+        await asyncio.sleep(0.01)
+
+        samples = [await self.read(app, token)]
+        while not all(i.done() for i in tasks):
+            samples.append(await self.read(app, token))
+
+        for status, content in await asyncio.gather(*tasks):
+            self.assertEqual(status, 200, content)
+
+        return Timing(name, samples)
+
+    # SQLite can't take the concurrent outstanding token inserts of the
+    # table store
+    @mock.patch.object(
+        TokenObtainPairView, "serializer_class", RedisTokenObtainPairSerializer
+    )
+    async def test_reads_during_a_login_burst(self) -> None:
+        user = await User.objects.acreate(email="user@example.com")
+        await sync_to_async(user.set_password)("Correct-Horse-9")
+        await user.asave()
+        token = str(AccessToken.for_user(user))
+
+        # Every sync view, password hashing included, on one shared thread
+        shared = ASGIHandler()
+        await self.read(application, token)
+
+        idle = Timing("Idle", [await self.read(application, token) for _ in range(30)])
+        blocked = await self.measure_reads("Logins on the shared thread", shared, token)
+        offloaded = await self.measure_reads(
+            "Logins in password_executor", application, token
+        )
+        report(
+            f"Authenticated reads during {self.logins} concurrent logins",
+            idle,
+            blocked,
+            offloaded,
+        )
+
+        self.assertLess(offloaded.p95, blocked.p95)
+
+
+class PasswordValidationTests(SimpleTestCase):
+    user_inputs = ["someone.else@example.com", "Someone", "Else"]
+
+    def assert_rejected(self, password: str, message: str) -> None:
+        with self.assertRaises(ValidationError) as context:
+            user_service._validate_password(password, self.user_inputs)
+
+        self.assertIn(message, context.exception.message)
+
+    def test_accepts_strong_passwords(self) -> None:
+        for password in ("correct horse battery staple", "Tr0ub4dor&3-xylophone-7"):
+            with self.subTest(password=password):
+                user_service._validate_password(password, self.user_inputs)
+
+    def test_bounds_the_length(self) -> None:
+        self.assert_rejected("Sh0rt!", "at least 8 characters")
+        self.assert_rejected("Long-p4ss" * 20, "must not exceed 128 characters")
+
+    def test_requires_character_classes(self) -> None:
+        self.assert_rejected(
+            "onlylowercaseletters",
+            "at least 2 of: lowercase letters, uppercase letters, digits and "
+            "other characters",
+        )
+
+    def test_counts_symbols_and_non_ascii_as_one_class(self) -> None:
+        self.assertEqual(user_service._count_character_classes("aé!"), 2)
+        self.assertEqual(user_service._count_character_classes("aA1 "), 4)
+
+    def test_rejects_passwords_too_short_for_the_entropy(self) -> None:
+        self.assert_rejected(
+            "Aa1!Aa1!", "Add another word or two. Uncommon words are better."
+        )
+
+    def test_rejects_common_passwords(self) -> None:
+        self.assert_rejected("Q1w2e3r4t5y6u7i8", "This is a very common password.")
+
+    def test_rejects_user_inputs(self) -> None:
+        self.assert_rejected(
+            "Someone.Else@example.com",
+            "Avoid your name or email address in the password.",
+        )
+
+    def test_reports_the_strength(self) -> None:
+        with self.assertRaises(ValidationError) as context:
+            user_service._validate_password("Password12345678", self.user_inputs)
+
+        self.assertRegex(
+            str(context.exception.message),
+            r"^Weak password, password strength is \([0-9.]+ bits, minimum 50\)\. ",
+        )
+
+    def test_rates_only_the_zxcvbn_window(self) -> None:
+        window = settings.auth.password.zxcvbn_window
+        password = "correct horse battery staple"[:window] + "a" * 100
+
+        with mock.patch("apps.users.service.zxcvbn", wraps=zxcvbn) as rate:
+            user_service._validate_password(password, self.user_inputs)
+
+        self.assertEqual(len(rate.call_args.args[0]), window)
+
+
+@tag("benchmark")
+class PasswordValidationBenchmark(SimpleTestCase):
+    # Long inputs zxcvbn matches the most patterns in
+    passwords = {
+        "Repeated pair": "a1" * 64,
+        "Keyboard walk": "qwertyuiop[]asdfghjkl;'zxcvbnm,./" * 3 + "Q1",
+        "Dates": "1990-12-31" * 12 + "Ab",
+        "Sequence": (string.ascii_letters + string.digits) * 2,
+        "Dictionary words": "Password " * 14 + "1",
+    }
+
+    def test_worst_case_passwords(self) -> None:
+        timings = []
+
+        for name, password in self.passwords.items():
+            password = password[: settings.auth.password.max_length]
+
+            def validate() -> None:
+                try:
+                    user_service._validate_password(password, [])
+                except ValidationError:
+                    pass
+
+            full = measure(
+                f"{name}, full zxcvbn",
+                lambda: zxcvbn(password, max_length=len(password)),
+                repeat=3,
+            )
+            tiered = measure(f"{name}, tiered", validate, repeat=3)
+            timings += [full, tiered]
+
+            self.assertLess(tiered.median, full.median)
+
+        report("Validating worst-case passwords", *timings)
@@ -0,0 +1,67 @@
+import time
+from logging import getLogger
+from typing import Any, cast
+
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken, Token
+
+from django.utils.translation import gettext_lazy as _
+
+from settings.conf import redis_client, settings
+
+logger = getLogger(__name__)
+
+
+def get_blacklist_key(jti: str) -> str:
+    return f"{settings.redis.prefix.token_blacklist}.{jti}"
+
+
+def is_blacklisted(jti: str) -> bool:
+    return bool(redis_client.exists(get_blacklist_key(jti)))
+
+
+def blacklist_jti(jti: str, exp: int) -> bool:
+    """
+    Blacklists ``jti`` until ``exp``, after which the token is invalid anyway.
+
+    Returns False if it was already blacklisted, checked and set atomically so
+    only one of concurrent calls succeeds.
+    """
+    if exp <= time.time():
+        return True
+
+    return bool(redis_client.set(get_blacklist_key(jti), 1, nx=True, exat=exp))
+
+
+class RedisRefreshToken(RefreshToken):
+    """
+    Refresh token blacklisted in Redis instead of the ``token_blacklist``
+    tables.
+
+    Only blacklisted JTIs are stored, each until the token's ``exp``, the
+    outstanding token list isn't kept.
+    """
+
+    def check_blacklist(self) -> None:
+        if is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self) -> None:  # type: ignore[override]
+        """
+        :raises TokenError: If the token was already blacklisted, e.g. by a
+            concurrent refresh rotating it
+        """
+        if not blacklist_jti(self.payload[api_settings.JTI_CLAIM], self.payload["exp"]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def outstand(self) -> None:  # type: ignore[override]
+        return None
+
+    @classmethod
+    def for_user(cls, user: Any) -> "RedisRefreshToken":  # type: ignore[override]
+        # Token.for_user, skipping the outstanding token row
+        return cast(
+            "RedisRefreshToken",
+            Token.for_user.__func__(cls, user),  # type: ignore[attr-defined]
+        )
@@ -1,10 +1,11 @@
 from logging import getLogger
 from typing import Any, cast
+from uuid import UUID
 
 from django.core.files.uploadedfile import UploadedFile
 from django.forms import ValidationError
+from django.http import HttpRequest, HttpResponse
 from django.utils.decorators import method_decorator
-from django_ratelimit.decorators import ratelimit
 from rest_framework.permissions import (
     IsAuthenticatedOrReadOnly,
 )
@@ -17,7 +18,9 @@ from rest_framework.status import (
 )
 from rest_framework.viewsets import ViewSet
 
+from common.async_views import async_read_view, render_json
 from common.get_required_field import require_field
+from common.ratelimit import ratelimit
 from common.security import sanitize_data
 from settings.conf import settings
 
@@ -32,6 +35,16 @@ from .service import user_service
 logger = getLogger(__name__)
 
 
+@async_read_view
+async def async_user_detail(request: HttpRequest, user_id: UUID) -> HttpResponse | None:
+    try:
+        user = await User.objects.aget(id=user_id)
+    except User.DoesNotExist:
+        return None
+
+    return render_json(UserRetrieveSerializer(user).data)
+
+
 @method_decorator(ratelimit(key="ip", rate="5/m", method="POST"), name="create")
 class RegisterViewSet(ViewSet):
     def create(self, request: Request) -> Response:
@@ -66,7 +79,9 @@ class UserViewSet(ViewSet):
 
     def partial_update(self, request: Request) -> Response:
         assert isinstance(request.user, User), "request.user type is not models.User"
-        user = request.user
+        # request.user only has the cached authentication fields, saving it
+        # could write them back stale
+        user = User.objects.get(pk=request.user.pk)
 
         logger.info("Updating user, user_id: %s", user.id)
 
@@ -96,7 +111,8 @@ class AvatarViewSet(ViewSet):
     def partial_update(self, request: Request) -> Response:
         # TODO: Make compression of an avatar
 
-        user = request.user
+        # See UserViewSet.partial_update
+        user = User.objects.get(pk=request.user.pk)
         logger.info("Updating avatar, user_id: %s", user.id)
 
         avatar_file: UploadedFile = require_field(
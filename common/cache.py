@@ -0,0 +1,300 @@
+import contextvars
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+from logging import getLogger
+from typing import Any, Callable, Iterable
+from uuid import uuid4
+
+from django_redis import get_redis_connection
+
+from django.core.cache import cache, caches
+from django.db import close_old_connections
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_response_headers
+from django.utils.http import quote_etag
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.status import HTTP_200_OK
+
+from settings.conf import settings
+
+from .cache_backends import TwoTierRedisCache
+from .conditional import make_data_etag
+
+logger = getLogger(__name__)
+
+ViewFunc = Callable[..., Response]
+CachedViewFunc = Callable[..., Response | HttpResponse]
+ResponseTagsFunc = Callable[[Response], Iterable[str]]
+SkipCacheFunc = Callable[[Request], bool]
+
+# Deletes every key registered under the given tag sets, then the sets
+# themselves, atomically and in a single round trip. Returns the deleted keys.
+_INVALIDATE_SCRIPT = """
+local deleted = {}
+for _, tag in ipairs(KEYS) do
+    local members = redis.call('SMEMBERS', tag)
+    for i = 1, #members, 500 do
+        redis.call('UNLINK', unpack(members, i, math.min(i + 499, #members)))
+    end
+    for _, member in ipairs(members) do
+        table.insert(deleted, member)
+    end
+    redis.call('DEL', tag)
+end
+return deleted
+"""
+
+
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+_refresh_executor = ThreadPoolExecutor(
+    max_workers=settings.redis.page_refresh_workers,
+    thread_name_prefix="page-refresh",
+)
+
+
+def _broadcast_invalidation(full_keys: list[str]) -> None:
+    """Keeps the in-process tier coherent with keys written to Redis directly."""
+    backend = caches["default"]
+
+    if isinstance(backend, TwoTierRedisCache):
+        backend.broadcast_invalidation(full_keys)
+
+
+def _tag_key(tag: str) -> str:
+    return cache.make_key(f"tag.{tag}")
+
+
+def get_page_key(key_prefix: str, request: Request) -> str:
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f"page.{key_prefix}.{path}"
+
+
+def set_tagged(key: str, value: Any, timeout: int, tags: Iterable[str]) -> None:
+    """Stores ``value`` and registers it under ``tags`` in one pipeline."""
+    full_key = cache.make_key(key)
+    connection = get_redis_connection("default")
+
+    with connection.pipeline() as pipe:
+        pipe.set(full_key, cache.client.encode(value), ex=timeout)  # type: ignore
+        for tag in tags:
+            tag_key = _tag_key(tag)
+            pipe.sadd(tag_key, full_key)
+            # Outlive every member, members that expired on their own are
+            # harmless when the tag is invalidated
+            pipe.expire(tag_key, timeout, gt=True)
+            pipe.expire(tag_key, timeout, nx=True)
+        pipe.execute()
+
+    _broadcast_invalidation([full_key])
+
+
+def invalidate_tags(*tags: str) -> int:
+    """Deletes every cached entry registered under any of ``tags``."""
+    if not tags:
+        return 0
+
+    connection = get_redis_connection("default")
+    script = connection.register_script(_INVALIDATE_SCRIPT)
+    deleted: list[bytes] = script(keys=[_tag_key(i) for i in tags])  # type: ignore
+    _broadcast_invalidation([i.decode() for i in deleted])
+
+    logger.debug("Invalidated tags %s, %d keys deleted", tags, len(deleted))
+    return len(deleted)
+
+
+def acquire_lock(name: str, timeout: int) -> str | None:
+    """Takes a short Redis lock, returns its token or None if it's held."""
+    token = uuid4().hex
+    connection = get_redis_connection("default")
+
+    if connection.set(cache.make_key(f"lock.{name}"), token, nx=True, ex=timeout):
+        return token
+
+    return None
+
+
+def release_lock(name: str, token: str) -> None:
+    connection = get_redis_connection("default")
+    script = connection.register_script(_RELEASE_LOCK_SCRIPT)
+    script(keys=[cache.make_key(f"lock.{name}")], args=[token])
+
+
+def get_page_etag(entry: dict[str, Any]) -> str:
+    # Entries stored before ETags were kept with them have none
+    etag: str | None = entry.get("etag")
+
+    return etag or make_data_etag(entry["data"])
+
+
+def _answer_conditional(
+    request: Request, response: Response, etag: str
+) -> Response | HttpResponse:
+    response["ETag"] = quote_etag(etag)
+
+    return get_conditional_response(request, etag=response["ETag"], response=response)
+
+
+def _is_cacheable(response: Response) -> bool:
+    return response.status_code == HTTP_200_OK and "private" not in response.get(
+        "Cache-Control", ""
+    )
+
+
+def _store_page(
+    key: str,
+    response: Response,
+    timeout: int,
+    tags: Iterable[str],
+    response_tags: ResponseTagsFunc | None,
+) -> str:
+    if response_tags is not None:
+        tags = [*tags, *response_tags(response)]
+
+    etag = make_data_etag(response.data)
+    entry = {
+        "data": response.data,
+        "status": response.status_code,
+        "etag": etag,
+        "fresh_until": time.time() + timeout,
+    }
+    set_tagged(key, entry, timeout + settings.redis.page_stale_timeout, tags)
+
+    return etag
+
+
+def _refresh_page(
+    view_func: ViewFunc,
+    request: Request,
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+    key: str,
+    token: str,
+    timeout: int,
+    tags: Iterable[str],
+    response_tags: ResponseTagsFunc | None,
+) -> None:
+    try:
+        response = view_func(request, *args, **kwargs)
+
+        if _is_cacheable(response):
+            _store_page(key, response, timeout, tags, response_tags)
+            logger.debug("Stale page refreshed, key: %s", key)
+
+    except Exception:
+        logger.exception("Failed to refresh stale page, key: %s", key)
+
+    finally:
+        release_lock(key, token)
+        close_old_connections()
+
+
+def _wait_for_page(key: str) -> dict[str, Any] | None:
+    deadline = time.monotonic() + settings.redis.page_lock_wait_timeout
+
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+
+        entry: dict[str, Any] | None = cache.get(key)
+        if entry is not None:
+            return entry
+
+    return None
+
+
+def cache_page(
+    timeout: int,
+    *,
+    key_prefix: str,
+    tags: Iterable[str] = (),
+    response_tags: ResponseTagsFunc | None = None,
+    skip_cache: SkipCacheFunc | None = None,
+) -> Callable[[ViewFunc], CachedViewFunc]:
+    """
+    Caches the response data of a DRF read view under tags.
+
+    Every page is tagged with ``key_prefix``, so ``invalidate_tags(key_prefix)``
+    drops all of them. Extra ``tags`` are formatted with the view kwargs, e.g.
+    ``"comment_list.{post_slug}"``. ``response_tags(response)`` adds tags from
+    the page content, e.g. one per listed object. Responses marked
+    ``Cache-Control: private`` are never stored, requests for which
+    ``skip_cache(request)`` is true, e.g. per-user pages, bypass the cache and
+    its lock entirely rather than waiting for a page that won't be stored.
+
+    The ETag of a page is computed once and stored with it, so
+    ``If-None-Match`` is answered with 304 without querying the database.
+
+    After ``timeout`` a page is stale but still served for
+    ``settings.redis.page_stale_timeout`` while a single worker refreshes it in
+    the background. On a miss only the worker holding the page lock runs the
+    view, the others wait briefly for its result.
+    """
+    tag_templates = tuple(tags)
+
+    def decorator(view_func: ViewFunc) -> CachedViewFunc:
+        @wraps(view_func)
+        def wrapper(
+            request: Request, *args: Any, **kwargs: Any
+        ) -> Response | HttpResponse:
+            if request.method not in ("GET", "HEAD") or (
+                skip_cache is not None and skip_cache(request)
+            ):
+                return view_func(request, *args, **kwargs)
+
+            key = get_page_key(key_prefix, request)
+            page_tags = [key_prefix, *(i.format(**kwargs) for i in tag_templates)]
+            entry: dict[str, Any] | None = cache.get(key)
+
+            if entry is not None and entry.get("fresh_until", 0) < time.time():
+                if token := acquire_lock(key, settings.redis.page_lock_timeout):
+                    context = contextvars.copy_context()
+                    _refresh_executor.submit(
+                        context.run,
+                        _refresh_page,
+                        view_func,
+                        request,
+                        args,
+                        kwargs,
+                        key,
+                        token,
+                        timeout,
+                        page_tags,
+                        response_tags,
+                    )
+
+            if entry is None:
+                token = acquire_lock(key, settings.redis.page_lock_timeout)
+
+                if token is None:
+                    logger.debug("Page is being computed, waiting, key: %s", key)
+                    entry = _wait_for_page(key)
+
+            if entry is not None:
+                response = Response(entry["data"], status=entry["status"])
+                patch_response_headers(response, cache_timeout=timeout)
+                return _answer_conditional(request, response, get_page_etag(entry))
+
+            try:
+                response = view_func(request, *args, **kwargs)
+
+                if _is_cacheable(response):
+                    etag = _store_page(key, response, timeout, page_tags, response_tags)
+                    patch_response_headers(response, cache_timeout=timeout)
+                    return _answer_conditional(request, response, etag)
+            finally:
+                if token is not None:
+                    release_lock(key, token)
+
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,362 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from logging import getLogger
+from typing import Any, Callable, Iterable
+from weakref import WeakKeyDictionary
+
+import redis.asyncio as aioredis
+from django_redis.cache import RedisCache
+from redis import Redis
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+from .lru import ExpiringLRU
+
+logger = getLogger(__name__)
+
+_MISSING = ExpiringLRU.MISSING
+_CLEAR_ALL = "*"
+
+
+class LocalTier:
+    """
+    Bounded in-process ``ExpiringLRU`` with a TTL per entry, kept coherent
+    over pub/sub.
+
+    Every eviction bumps ``generation``, so a value read from Redis before an
+    invalidation is never stored after it, see ``set_if_current``. The tier is
+    only usable while its listener is subscribed, messages published while it
+    is disconnected are lost.
+    """
+
+    def __init__(self, max_entries: int, timeout: float, channel: str) -> None:
+        self.timeout = timeout
+        self.channel = channel
+        self.generation = 0
+        self.stats = {"l1_hits": 0, "l1_misses": 0, "l2_hits": 0, "l2_misses": 0}
+
+        self._entries = ExpiringLRU(max_entries)
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._listener_pid: int | None = None
+
+    def get(self, key: str) -> Any:
+        """Returns the value or ``ExpiringLRU.MISSING``."""
+        return self._entries.get(key)
+
+    def set_if_current(self, key: str, value: Any, generation: int) -> None:
+        with self._lock:
+            if generation == self.generation:
+                self._entries.set(key, value, time.time() + self.timeout)
+
+    def evict(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            self.generation += 1
+            for key in keys:
+                self._entries.delete(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def get_stats(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self.stats)
+
+    def is_ready(self, get_client: Callable[[], Redis]) -> bool:
+        """Starts the invalidation listener in this process if needed."""
+        if self._listener_pid != os.getpid():
+            with self._lock:
+                if self._listener_pid != os.getpid():
+                    # Forked workers inherit neither the thread nor valid entries
+                    self._ready.clear()
+                    self._entries.clear()
+                    self.generation += 1
+                    self._listener_pid = os.getpid()
+
+                    threading.Thread(
+                        target=self._listen,
+                        args=(get_client,),
+                        name="cache-l1-invalidation",
+                        daemon=True,
+                    ).start()
+
+        return self._ready.is_set()
+
+    def _listen(self, get_client: Callable[[], Redis]) -> None:
+        backoff = 0.5
+
+        while True:
+            try:
+                pubsub = get_client().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+
+                self.clear()
+                self._ready.set()
+                backoff = 0.5
+
+                for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+
+                    full_keys = json.loads(message["data"])
+                    if _CLEAR_ALL in full_keys:
+                        self.clear()
+                    else:
+                        self.evict(full_keys)
+
+            except Exception:
+                logger.exception("L1 invalidation listener disconnected")
+
+            self._ready.clear()
+            self.clear()
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+
+_local_tiers: dict[tuple[str, str], LocalTier] = {}
+_local_tiers_lock = threading.Lock()
+
+
+def _get_local_tier(server: str, options: dict[str, Any]) -> LocalTier:
+    # Django builds a cache backend per thread, the tier is shared per process
+    channel = options.get("L1_CHANNEL", "cache.l1.invalidate")
+
+    with _local_tiers_lock:
+        if (server, channel) not in _local_tiers:
+            _local_tiers[server, channel] = LocalTier(
+                max_entries=options.get("L1_MAX_ENTRIES", 1000),
+                timeout=options.get("L1_TIMEOUT", 5),
+                channel=channel,
+            )
+
+        return _local_tiers[server, channel]
+
+
+_async_clients: WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[str, aioredis.Redis]
+] = WeakKeyDictionary()
+
+
+class TwoTierRedisCache(RedisCache):
+    """
+    django-redis backend with a bounded in-process tier in front of Redis.
+
+    Only keys starting with one of ``OPTIONS["L1_KEY_PREFIXES"]`` are kept in
+    process, for at most ``L1_TIMEOUT`` seconds. Writes through this backend
+    evict the key locally and announce it on ``L1_CHANNEL``, and every process
+    drops it from its own tier when the message arrives. Keys written to Redis
+    directly must be announced with ``broadcast_invalidation``.
+
+    Values from the local tier are shared between callers, treat them as
+    read-only.
+    """
+
+    def __init__(self, server: str, params: dict[str, Any]) -> None:
+        super().__init__(server, params)
+        options = params.get("OPTIONS", {})
+
+        self.l1 = _get_local_tier(str(server), options)
+        self.l1_key_prefixes = tuple(options.get("L1_KEY_PREFIXES", ()))
+
+    def get(
+        self, key: Any, default: Any = None, version: int | None = None, client=None
+    ) -> Any:
+        if not self._uses_l1(key):
+            return super().get(key, default, version=version, client=client)
+
+        full_key = self.make_key(key, version=version)
+        value = self.l1.get(full_key)
+
+        if value is not _MISSING:
+            self.l1.count("l1_hits")
+            return value
+
+        self.l1.count("l1_misses")
+        generation = self.l1.generation
+        value = super().get(key, _MISSING, version=version, client=client)
+
+        if value is _MISSING:
+            self.l1.count("l2_misses")
+            return default
+
+        self.l1.count("l2_hits")
+        self.l1.set_if_current(full_key, value, generation)
+
+        return value
+
+    async def aget(
+        self, key: Any, default: Any = None, version: int | None = None
+    ) -> Any:
+        """``get`` on an async Redis connection, without a thread hop."""
+        full_key = self.make_key(key, version=version)
+        uses_l1 = self._uses_l1(key)
+
+        if uses_l1:
+            value = self.l1.get(full_key)
+
+            if value is not _MISSING:
+                self.l1.count("l1_hits")
+                return value
+
+            self.l1.count("l1_misses")
+
+        generation = self.l1.generation
+        raw = await self._get_async_client().get(full_key)
+
+        if raw is None:
+            if uses_l1:
+                self.l1.count("l2_misses")
+            return default
+
+        value = self.client.decode(raw)
+
+        if uses_l1:
+            self.l1.count("l2_hits")
+            self.l1.set_if_current(full_key, value, generation)
+
+        return value
+
+    async def aset(
+        self,
+        key: Any,
+        value: Any,
+        timeout: Any = DEFAULT_TIMEOUT,
+        version: int | None = None,
+    ) -> None:
+        """``set`` on an async Redis connection, without a thread hop."""
+        full_key = self.make_key(key, version=version)
+        client = self._get_async_client()
+        timeout = self.get_backend_timeout(timeout)
+
+        if timeout is not None and timeout <= 0:
+            await client.delete(full_key)
+        else:
+            await client.set(
+                full_key,
+                self.client.encode(value),
+                px=None if timeout is None else int(timeout * 1000),
+            )
+
+        if self._is_l1_key(key):
+            self.l1.evict([full_key])
+            try:
+                await client.publish(self.l1.channel, json.dumps([full_key]))
+            except Exception:
+                logger.exception("Failed to publish L1 invalidation")
+
+    def set(
+        self,
+        key: Any,
+        value: Any,
+        timeout: Any = DEFAULT_TIMEOUT,
+        version: int | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        result = super().set(key, value, timeout, version=version, **kwargs)
+        self._invalidate_keys([key], version)
+        return result
+
+    def add(
+        self,
+        key: Any,
+        value: Any,
+        timeout: Any = DEFAULT_TIMEOUT,
+        version: int | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        result = super().add(key, value, timeout, version=version, **kwargs)
+        self._invalidate_keys([key], version)
+        return result
+
+    def set_many(
+        self,
+        data: dict[Any, Any],
+        timeout: Any = DEFAULT_TIMEOUT,
+        version: int | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        result = super().set_many(data, timeout, version=version, **kwargs)
+        self._invalidate_keys(data, version)
+        return result
+
+    def delete(self, key: Any, version: int | None = None, **kwargs: Any) -> Any:
+        result = super().delete(key, version=version, **kwargs)
+        self._invalidate_keys([key], version)
+        return result
+
+    def delete_many(
+        self, keys: Iterable[Any], version: int | None = None, **kwargs: Any
+    ) -> Any:
+        keys = list(keys)
+        result = super().delete_many(keys, version=version, **kwargs)
+        self._invalidate_keys(keys, version)
+        return result
+
+    def clear(self) -> Any:
+        result = super().clear()
+        self.l1.clear()
+        self._publish([_CLEAR_ALL])
+        return result
+
+    def broadcast_invalidation(self, full_keys: Iterable[str]) -> None:
+        """Drops already-prefixed keys from the local tier of every process."""
+        full_keys = [
+            i for i in full_keys if any(f":{j}" in i for j in self.l1_key_prefixes)
+        ]
+
+        if full_keys:
+            self.l1.evict(full_keys)
+            self._publish(full_keys)
+
+    def get_stats(self) -> dict[str, int]:
+        return self.l1.get_stats()
+
+    def _get_async_client(self) -> aioredis.Redis:
+        # Async connections belong to one event loop, backends don't
+        clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+        servers = self._server
+        # Reads and writes go to the primary, like django-redis writes do
+        location = (servers.split(",") if isinstance(servers, str) else servers)[0]
+
+        if location not in clients:
+            options = self._params.get("OPTIONS", {})
+            clients[location] = aioredis.Redis.from_url(
+                location, password=options.get("PASSWORD")
+            )
+
+        return clients[location]
+
+    def _is_l1_key(self, key: Any) -> bool:
+        return str(key).startswith(self.l1_key_prefixes)
+
+    def _uses_l1(self, key: Any) -> bool:
+        return self._is_l1_key(key) and self.l1.is_ready(
+            lambda: self.client.get_client(write=False)
+        )
+
+    def _invalidate_keys(self, keys: Iterable[Any], version: int | None) -> None:
+        full_keys = [
+            self.make_key(i, version=version) for i in keys if self._is_l1_key(i)
+        ]
+
+        if full_keys:
+            self.l1.evict(full_keys)
+            self._publish(full_keys)
+
+    def _publish(self, full_keys: list[str]) -> None:
+        try:
+            self.client.get_client(write=True).publish(
+                self.l1.channel, json.dumps(full_keys)
+            )
+        except Exception:
+            # Other processes can't be told, they fall back on L1_TIMEOUT
+            logger.exception("Failed to publish L1 invalidation")
@@ -1,5 +1,5 @@
-from django.core.cache import cache
+from .cache import invalidate_tags
 
 
 def clear_cache(prefix: str) -> None:
-    cache.delete_many(keys=cache.keys(f"*.{prefix}.*"))  # type: ignore
+    invalidate_tags(prefix)
@@ -0,0 +1,61 @@
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Callable
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpRequest, HttpResponse
+from django.views.decorators.http import condition
+from rest_framework.request import Request
+
+ConditionalState = tuple[str, datetime | None]
+StateFunc = Callable[..., ConditionalState]
+
+
+def make_etag(*parts: Any) -> str:
+    return hashlib.md5(":".join(str(i) for i in parts).encode()).hexdigest()
+
+
+def make_data_etag(data: Any) -> str:
+    """ETag of response data, e.g. to store it alongside a cached page."""
+    return make_etag(json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True))
+
+
+def conditional(state_func: StateFunc) -> Callable:
+    """
+    Answers ``If-None-Match`` and ``If-Modified-Since`` with 304 before the
+    view runs, and sets ``ETag`` and ``Last-Modified`` on full responses.
+
+    ``state_func(request, *args, **kwargs)`` returns ``(etag, last_modified)``
+    and is evaluated once per request.
+    """
+
+    def get_state(request: Request, *args: Any, **kwargs: Any) -> ConditionalState:
+        state: ConditionalState | None = getattr(request, "_conditional_state", None)
+
+        if state is None:
+            state = state_func(request, *args, **kwargs)
+            request._conditional_state = state  # type: ignore[attr-defined]
+
+        return state
+
+    return condition(
+        etag_func=lambda *args, **kwargs: get_state(*args, **kwargs)[0],
+        last_modified_func=lambda *args, **kwargs: get_state(*args, **kwargs)[1],
+    )
+
+
+def apply_conditional(
+    request: HttpRequest,
+    state: ConditionalState,
+    get_response: Callable[[], HttpResponse],
+) -> HttpResponse:
+    """
+    ``conditional`` for a state that's already known, e.g. awaited by an async
+    view. ``get_response`` is only called if the client's copy is outdated.
+    """
+    view = condition(
+        etag_func=lambda _: state[0], last_modified_func=lambda _: state[1]
+    )(lambda _: get_response())
+
+    return view(request)
@@ -0,0 +1,68 @@
+from typing import AsyncIterator, Iterator
+
+from asgiref.sync import sync_to_async
+
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+from django.http import HttpRequest, StreamingHttpResponse
+from rest_framework.request import Request
+
+from .serializers import ValuesSerializer
+
+
+def iter_ndjson(
+    queryset: QuerySet, serializer: ValuesSerializer, chunk_size: int
+) -> Iterator[str]:
+    """
+    Yields ``queryset`` as NDJSON, one chunk of lines at a time.
+
+    Rows are read with ``.iterator(chunk_size)``, a server-side cursor on
+    PostgreSQL, so memory stays constant whatever the table size.
+    """
+    encoder = DjangoJSONEncoder()
+    rows = serializer.values(queryset.order_by("pk")).iterator(chunk_size=chunk_size)
+    lines: list[str] = []
+
+    for row in rows:
+        lines.append(encoder.encode(serializer.to_representation(row)))
+
+        if len(lines) == chunk_size:
+            yield "\n".join(lines) + "\n"
+            lines = []
+
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+async def aiter_chunks(chunks: Iterator[str]) -> AsyncIterator[str]:
+    """
+    Reads a sync iterator of non-empty chunks one chunk per ``sync_to_async``
+    call, always on the request's sync thread, which owns its DB cursor.
+    """
+
+    @sync_to_async
+    def read_chunk() -> str | None:
+        return next(chunks, None)
+
+    while (chunk := await read_chunk()) is not None:
+        yield chunk
+
+
+def ndjson_response(
+    request: HttpRequest | Request, lines: Iterator[str], filename: str
+) -> StreamingHttpResponse:
+    """
+    Streams ``lines`` as an NDJSON attachment.
+
+    Under ASGI a sync iterator would be read whole before the first byte is
+    sent, so it's streamed through ``aiter_chunks`` there.
+    """
+    http_request = request._request if isinstance(request, Request) else request
+    content = aiter_chunks(lines) if isinstance(http_request, ASGIRequest) else lines
+
+    response = StreamingHttpResponse(content, content_type="application/x-ndjson")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    response["Cache-Control"] = "no-store"
+
+    return response
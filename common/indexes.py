@@ -0,0 +1,40 @@
+from typing import Any
+
+from django.contrib.postgres.indexes import GinIndex
+from django.db.backends.base.schema import BaseDatabaseSchemaEditor
+from django.db.backends.ddl_references import Statement
+from django.db.models import Model
+
+
+class PostgreSQLGinIndex(GinIndex):
+    """
+    ``GinIndex`` that's only created on PostgreSQL.
+
+    Other databases, e.g. the sqlite used in development, get an empty
+    statement instead of failing on ``USING gin``, also when sqlite rebuilds
+    the table in a later migration.
+    """
+
+    def create_sql(
+        self,
+        model: type[Model],
+        schema_editor: BaseDatabaseSchemaEditor,
+        using: str = "",
+        **kwargs: Any,
+    ) -> Statement:
+        if schema_editor.connection.vendor != "postgresql":
+            return Statement("")
+
+        statement: Statement = super().create_sql(
+            model, schema_editor, using=using, **kwargs
+        )
+        return statement
+
+    def remove_sql(
+        self, model: type[Model], schema_editor: BaseDatabaseSchemaEditor, **kwargs: Any
+    ) -> str:
+        if schema_editor.connection.vendor != "postgresql":
+            return ""
+
+        statement: str = super().remove_sql(model, schema_editor, **kwargs)
+        return statement
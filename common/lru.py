@@ -0,0 +1,56 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+_MISSING = object()
+
+
+class ExpiringLRU:
+    """
+    Thread-safe in-process LRU whose entries expire at a wall-clock time,
+    e.g. the ``exp`` claim of a token.
+    """
+
+    MISSING = _MISSING
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        """Returns the value or ``ExpiringLRU.MISSING``."""
+        with self._lock:
+            item = self._entries.get(key)
+
+            if item is None:
+                return _MISSING
+
+            expires_at, value = item
+            if expires_at <= time.time():
+                del self._entries[key]
+                return _MISSING
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
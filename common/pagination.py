@@ -1,7 +1,173 @@
-from rest_framework.pagination import LimitOffsetPagination
+import json
+from typing import Any, Sequence, cast
 
+from django.core.exceptions import ValidationError
+from django.db.models import Field, Model, Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination,
+    Cursor,
+    CursorPagination,
+    LimitOffsetPagination,
+)
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+DEFAULT_ORDERING = ("-created_at", "-id")
+
+
+class KeysetPagination(CursorPagination):
+    """
+    ``CursorPagination`` whose cursor holds every ``ordering`` field, e.g.
+    ``(created_at, id)``, instead of only the first one.
+
+    Pages start strictly after the row at the cursor, so rows sharing a
+    ``created_at`` are neither skipped nor repeated and there's no OFFSET,
+    however many of them there are. Every field must be ordered in the same
+    direction and together they must be unique.
+    """
 
-class CustomPagination(LimitOffsetPagination):
     page_size = 20
     page_size_query_param = "page_size"
     max_page_size = 50
+    ordering: tuple[str, ...] = DEFAULT_ORDERING
+
+    def paginate_queryset(
+        self, queryset: QuerySet, request: Request, view: Any = None
+    ) -> list[Any] | None:
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+
+        if self.cursor is not None and self.cursor.position is not None:
+            position = self._decode_position(queryset.model, self.cursor.position)
+            queryset = queryset.filter(self._get_after_filter(position, reverse))
+
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(_invert(i) for i in ordering)
+
+        # One extra row tells whether there's a page beyond this one
+        rows = list(queryset.order_by(*ordering)[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        self.page = rows[: self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            # Coming back from the next page, so it's there
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+
+        return self.page
+
+    def get_next_link(self) -> str | None:
+        if not self.has_next or not self.page:
+            return None
+
+        position = self._get_position(self.page[-1])
+        link: str = self.encode_cursor(
+            Cursor(offset=0, reverse=False, position=position)
+        )
+        return link
+
+    def get_previous_link(self) -> str | None:
+        if not self.has_previous or not self.page:
+            return None
+
+        position = self._get_position(self.page[0])
+        link: str = self.encode_cursor(
+            Cursor(offset=0, reverse=True, position=position)
+        )
+        return link
+
+    def _get_values(self, row: Any) -> list[Any]:
+        names = [i.lstrip("-") for i in self.ordering]
+
+        if isinstance(row, dict):
+            return [row[i] for i in names]
+        return [getattr(row, i) for i in names]
+
+    def _get_position(self, row: Any) -> str:
+        return json.dumps([str(i) for i in self._get_values(row)])
+
+    def _decode_position(self, model: type[Model], position: str) -> list[Any]:
+        """:raises NotFound: If the position doesn't match the ordering"""
+        try:
+            values = json.loads(position)
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError(position)
+
+            return [
+                cast(Field, model._meta.get_field(name.lstrip("-"))).to_python(value)
+                for name, value in zip(self.ordering, values)
+            ]
+        except (ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _get_after_filter(self, position: list[Any], reverse: bool) -> Q:
+        # Row comparison (a, b) < (x, y) spelled out as a < x OR a = x AND b < y
+        descending = self.ordering[0].startswith("-")
+        lookup = "lt" if descending != reverse else "gt"
+        names = [i.lstrip("-") for i in self.ordering]
+
+        condition = Q()
+        for i, name in enumerate(names):
+            equal = {j: position[n] for n, j in enumerate(names[:i])}
+            condition |= Q(**equal, **{f"{name}__{lookup}": position[i]})
+
+        return condition
+
+
+def _invert(field: str) -> str:
+    return field[1:] if field.startswith("-") else f"-{field}"
+
+
+class OffsetPagination(LimitOffsetPagination):
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 50
+
+
+class CustomPagination(BasePagination):
+    """
+    Keyset pagination over ``(created_at, id)`` with opaque next/prev cursors.
+
+    Clients that send ``limit`` or ``offset`` keep the old offset pagination,
+    ordered the same way so their pages are stable too.
+    """
+
+    ordering: Sequence[str] = DEFAULT_ORDERING
+    offset_query_params = ("limit", "offset")
+
+    def __init__(self) -> None:
+        self.keyset = KeysetPagination()
+        self.keyset.ordering = tuple(self.ordering)
+        self.offset = OffsetPagination()
+        self.active: BasePagination = self.keyset
+
+    def is_offset_request(self, request: Request) -> bool:
+        return any(i in request.query_params for i in self.offset_query_params)
+
+    def paginate_queryset(
+        self, queryset: QuerySet, request: Request, view: Any = None
+    ) -> list[Any] | None:
+        if self.is_offset_request(request):
+            self.active = self.offset
+            queryset = queryset.order_by(*self.ordering)
+        else:
+            self.active = self.keyset
+
+        page: list[Any] | None = self.active.paginate_queryset(
+            queryset, request, view=view
+        )
+        return page
+
+    def get_paginated_response(self, data: Any) -> Response:
+        return self.active.get_paginated_response(data)
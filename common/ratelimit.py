@@ -0,0 +1,142 @@
+import uuid
+from functools import wraps
+from logging import getLogger
+from typing import Any, Callable, Iterable
+
+from django_redis import get_redis_connection
+
+from django.core.cache import cache
+from django.http import HttpRequest
+from django_ratelimit import ALL
+from django_ratelimit.exceptions import Ratelimited
+
+logger = getLogger(__name__)
+
+KeyFunc = Callable[[HttpRequest], str]
+
+_PERIODS = {"s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+
+# Sliding window log: the key is a sorted set of the requests allowed within
+# the last period, scored by their time in ms. Expired ones are dropped first,
+# so a request is allowed only while fewer than ``limit`` remain and at most
+# ``limit`` requests fit in any window of ``period``. Refused requests aren't
+# recorded. Returns 0 if allowed, otherwise the ms until the oldest one leaves
+# the window. Uses the Redis clock, so every worker shares one time source.
+_SLIDING_WINDOW_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - period)
+
+if redis.call('ZCARD', KEYS[1]) >= limit then
+    local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+    return math.max(tonumber(oldest[2]) + period - now, 1)
+end
+
+redis.call('ZADD', KEYS[1], now, ARGV[3])
+redis.call('PEXPIRE', KEYS[1], period)
+return 0
+"""
+
+
+def parse_rate(rate: str) -> tuple[int, int]:
+    """
+    Parses ``"<limit>/<period>"``, e.g. ``"5/m"`` or ``"100/10m"``, into the
+    limit and the period in seconds.
+
+    :raises ValueError:
+    """
+    limit, _, period = rate.partition("/")
+    multiplier, unit = period[:-1] or "1", period[-1:]
+
+    if unit not in _PERIODS or not limit.isdigit() or not multiplier.isdigit():
+        raise ValueError(f"Invalid rate {rate!r}, expected e.g. '5/m' or '100/10m'")
+
+    return int(limit), int(multiplier) * _PERIODS[unit]
+
+
+def _get_key(request: HttpRequest, key: str | KeyFunc) -> str:
+    if callable(key):
+        return key(request)
+
+    if key == "ip":
+        return str(request.META["REMOTE_ADDR"])
+
+    raise ValueError(f"Unknown rate limit key {key!r}, use 'ip' or a callable")
+
+
+def is_ratelimited(group: str, value: str, limit: int, period: int) -> int:
+    """
+    Counts a request of ``value`` against ``limit`` per ``period`` seconds in
+    one Redis round trip.
+
+    Returns 0 if it's allowed, otherwise the ms until the next one would be.
+    Requests are let through if Redis is unavailable.
+    """
+    period_ms = period * 1000
+
+    try:
+        connection = get_redis_connection("default")
+        script = connection.register_script(_SLIDING_WINDOW_SCRIPT)
+        retry_after: int = script(
+            keys=[cache.make_key(f"ratelimit.{group}.{value}")],
+            # Requests within the same ms need distinct members
+            args=[limit, period_ms, uuid.uuid4().hex],
+        )  # type: ignore
+    except Exception:
+        logger.exception("Rate limit check failed, group: %s", group)
+        return 0
+
+    return int(retry_after)
+
+
+def ratelimit(
+    group: str | None = None,
+    key: str | KeyFunc = "ip",
+    rate: str = "",
+    method: str | Iterable[str] | None = ALL,
+) -> Callable:
+    """
+    Drop-in for ``django_ratelimit.decorators.ratelimit`` with a sliding
+    window, e.g. ``ratelimit(key="ip", rate="5/m", method="POST")``.
+
+    Unlike fixed windows, bursts at window edges can't exceed ``rate``.
+    Requests of other methods aren't counted.
+
+    :raises Ratelimited: With ``retry_after`` in seconds, when over the rate
+    """
+    limit, period = parse_rate(rate)
+    # None counts every method, like django_ratelimit's ALL
+    methods: tuple[str, ...] | None = None
+
+    if isinstance(method, str):
+        methods = (method,)
+    elif method is not None and method is not ALL:
+        methods = tuple(method)
+
+    def decorator(view_func: Callable) -> Callable:
+        view_group = group or f"{view_func.__module__}.{view_func.__qualname__}"
+
+        @wraps(view_func)
+        def wrapper(request: HttpRequest, *args: Any, **kwargs: Any) -> Any:
+            if methods is not None and request.method not in methods:
+                return view_func(request, *args, **kwargs)
+
+            retry_after = is_ratelimited(
+                view_group, _get_key(request, key), limit, period
+            )
+            limited = getattr(request, "limited", False) or bool(retry_after)
+            request.limited = limited  # type: ignore[attr-defined]
+
+            if retry_after:
+                exc = Ratelimited()
+                exc.retry_after = -(-retry_after // 1000)  # type: ignore
+                raise exc
+
+            return view_func(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
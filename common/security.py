@@ -1,14 +1,75 @@
+import re
+import threading
 from typing import Any, Dict, List, Union
 
-import bleach  # type: ignore
+from bleach.sanitizer import Cleaner  # type: ignore
 
 JsonValue = Union[Dict[str, Any], List[Any], str, int, float, bool, None]
 
+# bleach leaves a string untouched unless it contains one of these: markup and
+# entities are stripped or escaped, CR is normalized and other control
+# characters are replaced
+_NEEDS_CLEANING_RE = re.compile(r"[<>&\x00-\x08\x0b-\x1f]")
+
+
+class HtmlSanitizer:
+    """
+    Strips HTML the way ``bleach.clean(text, tags=[], strip=True)`` does.
+
+    Strings that bleach would return unchanged skip the HTML parse entirely.
+    Cleaners are reused per thread, bleach's ``Cleaner`` isn't thread-safe.
+    """
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+
+    @property
+    def cleaner(self) -> Cleaner:
+        cleaner = getattr(self._local, "cleaner", None)
+
+        if cleaner is None:
+            cleaner = self._local.cleaner = Cleaner(tags=[], attributes={}, strip=True)
+
+        return cleaner
+
+    def clean(self, text: str) -> str:
+        if not text:
+            return ""
+        if _NEEDS_CLEANING_RE.search(text) is None:
+            return text
+        return str(self.cleaner.clean(text))
+
+    def clean_data(self, data: JsonValue, max_depth: int) -> JsonValue:
+        """
+        Cleans every string key and value in one pass over ``data``.
+
+        :raises ValueError: If nesting depth exceeds ``max_depth``
+        """
+        clean = self.clean
+
+        def walk(obj: JsonValue, depth: int) -> JsonValue:
+            if depth > max_depth:
+                raise ValueError(
+                    f"Payload structure exceeds maximum depth of {max_depth}"
+                )
+
+            if isinstance(obj, str):
+                return clean(obj)
+            elif isinstance(obj, dict):
+                return {clean(str(k)): walk(v, depth + 1) for k, v in obj.items()}
+            elif isinstance(obj, list):
+                return [walk(i, depth + 1) for i in obj]
+
+            return obj
+
+        return walk(data, 0)
+
+
+html_sanitizer = HtmlSanitizer()
+
 
 def sanitize_html_input(text: str) -> str:
-    if not text:
-        return ""
-    return str(bleach.clean(text, tags=[], attributes={}, strip=True))
+    return html_sanitizer.clean(text)
 
 
 def sanitize_data(data: dict[str, Any], max_depth: int = 10) -> dict[str, Any]:
@@ -25,24 +86,7 @@ def sanitize_data(data: dict[str, Any], max_depth: int = 10) -> dict[str, Any]:
     Raises:
         ValueError: If nesting depth exceeds max_depth
     """
-
-    def walk_and_sanitize(obj: JsonValue, depth: int = 0) -> JsonValue:
-        if depth > max_depth:
-            raise ValueError(f"Payload structure exceeds maximum depth of {max_depth}")
-
-        if isinstance(obj, dict):
-            return {
-                sanitize_html_input(str(k)): walk_and_sanitize(v, depth + 1)
-                for k, v in obj.items()
-            }
-        elif isinstance(obj, list):
-            return [walk_and_sanitize(i, depth + 1) for i in obj]
-        elif isinstance(obj, str):
-            return sanitize_html_input(obj)
-
-        return obj
-
-    result = walk_and_sanitize(data)
+    result = html_sanitizer.clean_data(data, max_depth)
 
     assert isinstance(
         result, dict
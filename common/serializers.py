@@ -0,0 +1,70 @@
+from typing import Any, Callable, Iterable
+
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+from rest_framework.fields import (
+    BooleanField,
+    CharField,
+    Field,
+    IntegerField,
+    ReadOnlyField,
+)
+from rest_framework.serializers import ModelSerializer
+
+Row = dict[str, Any]
+
+# Fields whose to_representation returns database values unchanged
+_PASSTHROUGH_FIELDS = (BooleanField, CharField, IntegerField, ReadOnlyField)
+
+
+class ValuesSerializer:
+    """
+    Read-only fast path for a ``ModelSerializer`` over ``.values()`` rows.
+
+    Produces the same output as ``serializer_class(instances, many=True).data``
+    without instantiating models or running DRF's per-field machinery. Fields
+    that need formatting, e.g. datetimes, still use their DRF
+    ``to_representation`` so the JSON stays identical.
+    """
+
+    def __init__(self, serializer_class: type[ModelSerializer]) -> None:
+        self.serializer_class = serializer_class
+
+    @cached_property
+    def _fields(self) -> list[tuple[str, str, Callable[[Any], Any] | None]]:
+        # Built lazily, serializer fields need a populated app registry
+        fields: dict[str, Field] = self.serializer_class().fields
+
+        return [
+            (
+                name,
+                field.source,
+                (
+                    None
+                    if isinstance(field, _PASSTHROUGH_FIELDS)
+                    else field.to_representation
+                ),
+            )
+            for name, field in fields.items()
+        ]
+
+    @property
+    def sources(self) -> list[str]:
+        return [source for _, source, _ in self._fields]
+
+    def values(self, queryset: QuerySet) -> QuerySet:
+        """Narrows ``queryset`` to dict rows with exactly the serialized columns."""
+        return queryset.values(*self.sources)
+
+    def to_representation(self, row: Row) -> Row:
+        return {
+            name: (
+                row[source]
+                if convert is None or row[source] is None
+                else convert(row[source])
+            )
+            for name, source, convert in self._fields
+        }
+
+    def many(self, rows: Iterable[Row]) -> list[Row]:
+        return [self.to_representation(i) for i in rows]
@@ -0,0 +1,189 @@
+import re
+from logging import getLogger
+from typing import Any, Iterable
+
+from autoslug import AutoSlugField
+from autoslug.utils import get_prepopulated_value
+
+from django.db import IntegrityError, transaction
+from django.db.models import Model, Q
+from django.db.models.functions import Length
+
+logger = getLogger(__name__)
+
+# Room kept at the end of a slug for the "-<n>" collision suffix
+_SUFFIX_RESERVE = 11
+
+
+class UniqueSlugField(AutoSlugField):
+    """
+    ``AutoSlugField`` that resolves collisions with a single query.
+
+    ``AutoSlugField`` probes ``-2``, ``-3``, ... with a query each, and checks
+    uniqueness again on every save. This field keeps any slug that is already
+    set, so existing slugs stay stable and slugs pre-assigned by
+    ``generate_unique_slugs`` cost nothing in ``bulk_create``. Concurrent
+    inserts are resolved by ``UniqueSlugMixin``.
+    """
+
+    def pre_save(self, model_instance: Model, add: bool) -> Any:
+        value = self.value_from_object(model_instance)
+
+        if self.unique_with:
+            return super().pre_save(model_instance, add)
+
+        if value and not self.always_update:
+            return value
+
+        slug = generate_unique_slug(self, model_instance)
+        setattr(model_instance, self.attname, slug)
+
+        return slug
+
+
+class UniqueSlugMixin:
+    """
+    Retries an insert whose ``UniqueSlugField`` value was taken concurrently.
+
+    The slug is looked up and inserted without a lock, another request can
+    take it in between, in which case a fresh slug is generated.
+    """
+
+    slug_attempts = 3
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        if not self._state.adding:  # type: ignore[attr-defined]
+            super().save(*args, **kwargs)  # type: ignore[misc]
+            return
+
+        for attempt in range(1, self.slug_attempts + 1):
+            try:
+                with transaction.atomic():
+                    super().save(*args, **kwargs)  # type: ignore[misc]
+                    return
+
+            except IntegrityError:
+                fields = self._get_taken_slug_fields()
+                if not fields or attempt == self.slug_attempts:
+                    raise
+
+                logger.debug("Slug taken concurrently, retrying, attempt %d", attempt)
+                for field in fields:
+                    setattr(self, field.attname, "")
+
+    def _get_taken_slug_fields(self) -> list[UniqueSlugField]:
+        model = type(self)
+        fields = [
+            i for i in model._meta.fields if isinstance(i, UniqueSlugField)  # type: ignore
+        ]
+
+        return [
+            i
+            for i in fields
+            if model._default_manager.filter(  # type: ignore[attr-defined]
+                **{i.name: getattr(self, i.attname)}
+            ).exists()
+        ]
+
+
+def _base_slug(field: AutoSlugField, value: str) -> str:
+    slug: str = field.slugify(value or "") or field.model._meta.model_name
+    return slug[: field.max_length]
+
+
+def _with_suffix(field: AutoSlugField, base: str, index: int) -> str:
+    suffix = f"{field.index_sep}{index}"
+    return f"{base[: field.max_length - len(suffix)]}{suffix}"
+
+
+def generate_unique_slug(field: AutoSlugField, instance: Model) -> str:
+    """
+    Returns a free slug for ``instance`` with one indexed query.
+
+    Only the exact slug and its highest ``-<n>`` variant are fetched, so the
+    cost doesn't grow with the number of posts sharing a title. See
+    ``generate_unique_slugs`` for the caveat on concurrent inserts.
+    """
+    base = _base_slug(field, get_prepopulated_value(field, instance))
+
+    if len(base) > field.max_length - _SUFFIX_RESERVE:
+        # Suffixes crop long slugs, the exact pattern below wouldn't match
+        return generate_unique_slugs(field, [instance])[0]
+
+    sep = field.index_sep
+    rival = (
+        field.model._default_manager.filter(
+            Q(**{field.name: base})
+            | Q(
+                **{
+                    f"{field.name}__startswith": f"{base}{sep}",
+                    f"{field.name}__regex": rf"^{re.escape(base + sep)}[0-9]+$",
+                }
+            )
+        )
+        .exclude(pk=instance.pk)
+        .order_by(Length(field.name).desc(), f"-{field.name}")
+        .values_list(field.name, flat=True)
+        .first()
+    )
+
+    if rival is None:
+        return base
+    if rival == base:
+        return _with_suffix(field, base, 2)
+
+    return _with_suffix(field, base, int(rival.rsplit(sep, 1)[1]) + 1)
+
+
+def generate_unique_slugs(
+    field: AutoSlugField, instances: Iterable[Model]
+) -> list[str]:
+    """
+    Returns a unique slug for every instance with a single query.
+
+    Slugs follow ``AutoSlugField``'s ``title``, ``title-2``, ``title-3`` scheme
+    and are unique among themselves too. A concurrent insert can still take
+    one of them first, so callers must handle ``IntegrityError``.
+    """
+    instances = list(instances)
+    bases = [_base_slug(field, get_prepopulated_value(field, i)) for i in instances]
+    if not bases:
+        return []
+
+    # Only the bases and their "-<n>" variants are fetched. Suffixes crop long
+    # bases, their variants are matched by the part that's never cropped
+    stem_length = field.max_length - _SUFFIX_RESERVE
+    variants = "|".join(
+        {
+            re.escape(i[:stem_length]) + (".*" if len(i) > stem_length else "")
+            for i in bases
+        }
+    )
+    suffix = rf"{re.escape(field.index_sep)}[0-9]+"
+
+    taken = set(
+        field.model._default_manager.filter(
+            Q(**{f"{field.name}__in": set(bases)})
+            | Q(**{f"{field.name}__regex": rf"^(?:{variants}){suffix}$"})
+        )
+        .exclude(pk__in=[i.pk for i in instances if i.pk is not None])
+        .values_list(field.name, flat=True)
+    )
+
+    # Resume from the last suffix per base, repeated titles stay linear
+    last_index: dict[str, int] = {}
+    slugs = []
+
+    for base in bases:
+        index = last_index.get(base, 1)
+        slug = base if index == 1 else _with_suffix(field, base, index)
+
+        while slug in taken:
+            index += 1
+            slug = _with_suffix(field, base, index)
+
+        last_index[base] = index
+        taken.add(slug)
+        slugs.append(slug)
+
+    return slugs
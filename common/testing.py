@@ -0,0 +1,156 @@
+import asyncio
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterator
+from urllib.parse import urlsplit
+
+from django.db import connections
+from django.test.runner import DiscoverRunner
+from django.test.utils import CaptureQueriesContext
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Leaves the timing based ``benchmark`` tests out unless they're asked for
+    with ``--tag benchmark``, they're slow and flaky on a loaded machine.
+    """
+
+    def __init__(
+        self,
+        tags: list[str] | None = None,
+        exclude_tags: list[str] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        if not tags:
+            exclude_tags = [*(exclude_tags or []), "benchmark"]
+
+        super().__init__(tags=tags, exclude_tags=exclude_tags, **kwargs)
+
+
+@contextmanager
+def assert_max_queries(
+    budget: int, using: str = "default"
+) -> Iterator[CaptureQueriesContext]:
+    """
+    Fails when the block runs more than ``budget`` queries, e.g.::
+
+        with assert_max_queries(3):
+            client.get("/api/posts/")
+
+    :raises AssertionError: Listing every captured query
+    """
+    with CaptureQueriesContext(connections[using]) as context:
+        yield context
+
+    if len(context) > budget:
+        queries = "\n".join(
+            f"{n}. {i['sql']}" for n, i in enumerate(context.captured_queries, 1)
+        )
+        raise AssertionError(
+            f"{len(context)} queries executed, budget is {budget}\n{queries}"
+        )
+
+
+async def asgi_request(
+    application: Callable[..., Awaitable[None]],
+    method: str,
+    url: str,
+    body: bytes = b"",
+    headers: dict[str, str] | None = None,
+) -> tuple[int, bytes]:
+    """
+    Sends one HTTP request straight to an ASGI ``application``, e.g.
+    ``settings.asgi.application``, which the test clients can't address.
+
+    Returns the status and the body.
+    """
+    parts = urlsplit(url)
+    headers = {
+        "host": "testserver",
+        "content-type": "application/json",
+        "content-length": str(len(body)),
+    } | (headers or {})
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": parts.path,
+        "raw_path": parts.path.encode(),
+        "query_string": parts.query.encode(),
+        "root_path": "",
+        "headers": [(k.encode(), v.encode()) for k, v in headers.items()],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    requests = [{"type": "http.request", "body": body, "more_body": False}]
+    disconnected = asyncio.Event()
+
+    async def receive() -> dict[str, Any]:
+        if requests:
+            return requests.pop()
+
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    status = 0
+    chunks: list[bytes] = []
+
+    async def send(message: dict[str, Any]) -> None:
+        nonlocal status
+
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await application(scope, receive, send)
+    finally:
+        disconnected.set()
+
+    return status, b"".join(chunks)
+
+
+@dataclass
+class Timing:
+    name: str
+    samples: list[float]
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.samples)
+
+    @property
+    def p95(self) -> float:
+        if len(self.samples) < 2:
+            return self.samples[0]
+        return statistics.quantiles(self.samples, n=20)[-1]
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name}: median {self.median * 1000:.3f} ms, "
+            f"p95 {self.p95 * 1000:.3f} ms, {len(self.samples)} runs"
+        )
+
+
+def measure(name: str, func: Callable[[], Any], repeat: int) -> Timing:
+    """Times ``repeat`` calls of ``func`` one by one."""
+    samples = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+
+    return Timing(name, samples)
+
+
+def report(title: str, *timings: Timing) -> None:
+    """Prints benchmark results, run them with ``manage.py test --tag benchmark``."""
+    lines = "\n".join(f"  {i}" for i in timings)
+    sys.stderr.write(f"\n{title}\n{lines}\n")
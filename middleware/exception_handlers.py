@@ -52,9 +52,11 @@ def custom_exception_handler(
             f"User with IP {ip} was blocked. "
             f"Rate limit exceeded for {request.method} {request.path}"
         )
+        retry_after = getattr(exc, "retry_after", None)
         return Response(
             {"detail": "Too many requests. Try again later."},
             status=HTTP_429_TOO_MANY_REQUESTS,
+            headers={"Retry-After": str(retry_after)} if retry_after else None,
         )
 
     return response
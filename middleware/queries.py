@@ -0,0 +1,143 @@
+import time
+from collections import Counter
+from contextvars import ContextVar
+from logging import getLogger
+from typing import Any, Callable
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpRequest, HttpResponse
+
+from settings.conf import settings
+
+logger = getLogger(__name__)
+
+
+class QueryRecorder:
+    """``execute_wrapper`` that counts queries, DB time and repeated SQL."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter[str] = Counter()
+
+    def __call__(
+        self,
+        execute: Callable[..., Any],
+        sql: str,
+        params: Any,
+        many: bool,
+        context: dict[str, Any],
+    ) -> Any:
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            # Parameters are passed separately, so the SQL text is the shape
+            self.shapes[sql] += 1
+
+    def get_repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [(i, n) for i, n in self.shapes.most_common() if n >= threshold]
+
+
+_current_recorder: ContextVar[QueryRecorder | None] = ContextVar(
+    "query_recorder", default=None
+)
+
+
+def _record_query(
+    execute: Callable[..., Any],
+    sql: str,
+    params: Any,
+    many: bool,
+    context: dict[str, Any],
+) -> Any:
+    # Context variables follow a request into sync_to_async threads, so
+    # overlapping requests sharing a connection each see their own recorder
+    recorder = _current_recorder.get()
+
+    if recorder is None:
+        return execute(sql, params, many, context)
+
+    return recorder(execute, sql, params, many, context)
+
+
+def _install(connection: BaseDatabaseWrapper) -> None:
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+@receiver(connection_created)
+def install_query_recorder(
+    sender: Any, connection: BaseDatabaseWrapper, **kwargs: Any
+) -> None:
+    _install(connection)
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Logs query count and DB time of every request, with a warning when the
+    request exceeds ``settings.log.query_budget`` or repeats one SQL statement
+    ``settings.log.repeated_query_threshold`` times, a likely N+1.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], Any]) -> None:
+        self.get_response = get_response
+
+        # Connections opened before this module was imported
+        for connection in connections.all(initialized_only=True):
+            _install(connection)
+
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> Any:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        recorder = QueryRecorder()
+        token = _current_recorder.set(recorder)
+        try:
+            response: HttpResponse = self.get_response(request)
+        finally:
+            _current_recorder.reset(token)
+
+        self._report(request, recorder)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        recorder = QueryRecorder()
+        token = _current_recorder.set(recorder)
+        try:
+            response: HttpResponse = await self.get_response(request)
+        finally:
+            _current_recorder.reset(token)
+
+        self._report(request, recorder)
+        return response
+
+    def _report(self, request: HttpRequest, recorder: QueryRecorder) -> None:
+        repeated = recorder.get_repeated(settings.log.repeated_query_threshold)
+        summary = (
+            "%s %s, %d queries in %.1fms",
+            request.method,
+            request.path,
+            recorder.count,
+            recorder.duration * 1000,
+        )
+
+        if recorder.count > settings.log.query_budget or repeated:
+            logger.warning(*summary)
+            for sql, count in repeated:
+                logger.warning("Repeated %d times: %s", count, sql[:500])
+        else:
+            logger.debug(*summary)
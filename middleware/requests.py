@@ -1,6 +1,8 @@
 import uuid
 from contextvars import ContextVar
-from typing import Callable
+from typing import Any, Callable
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 
 from django.http import HttpRequest, HttpResponse
 
@@ -8,14 +10,36 @@ request_id_var: ContextVar[str] = ContextVar("request_id", default="")
 
 
 class RequestIDMiddleware:
-    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], Any]) -> None:
         self.get_response = get_response
 
-    def __call__(self, request: HttpRequest) -> HttpResponse:
-        request_id: str = str(uuid.uuid4())
-        request_id_var.set(request_id)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> Any:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        request_id = self._set_request_id()
 
         response: HttpResponse = self.get_response(request)
         response["X-Request-ID"] = request_id
 
         return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        request_id = self._set_request_id()
+
+        response: HttpResponse = await self.get_response(request)
+        response["X-Request-ID"] = request_id
+
+        return response
+
+    def _set_request_id(self) -> str:
+        request_id: str = str(uuid.uuid4())
+        request_id_var.set(request_id)
+
+        return request_id
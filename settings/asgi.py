@@ -1,7 +1,19 @@
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from django.core.handlers.asgi import ASGIHandler, ASGIRequest
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "settings.base")
 
-application = get_asgi_application()
+
+class AsyncReadRequest(ASGIRequest):
+    # Resolved before ROOT_URLCONF, adds the native async read views
+    urlconf = "settings.urls_asgi"
+
+
+class AsyncReadASGIHandler(ASGIHandler):
+    request_class = AsyncReadRequest
+
+
+django.setup(set_prefix=False)
+application = AsyncReadASGIHandler()
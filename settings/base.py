@@ -8,7 +8,6 @@ from .conf import (
     settings,
 )
 
-
 _ = (DEBUG, BASE_DIR, ALLOWED_HOSTS, SECRET_KEY, SIMPLE_JWT, settings, CACHES)
 
 
@@ -19,6 +18,7 @@ DJANGO_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "rest_framework_simplejwt",
     "rest_framework_simplejwt.token_blacklist",
@@ -40,6 +40,7 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "middleware.requests.RequestIDMiddleware",
+    "middleware.queries.QueryInstrumentationMiddleware",
 ]
 
 ROOT_URLCONF = "settings.urls"
@@ -61,6 +62,8 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "settings.wsgi.application"
 
+TEST_RUNNER = "common.testing.TestRunner"
+
 
 if settings.db.engine == "postgresql":
     database_config = {
@@ -102,7 +105,7 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "apps.users.authentication.CachedJWTAuthentication",
     ),
     "EXCEPTION_HANDLER": "middleware.exception_handlers.custom_exception_handler",
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
@@ -110,7 +113,7 @@ REST_FRAMEWORK = {
 }
 
 
-PASSWORD_HASHERS: list[str] = ["django.contrib.auth.hashers.Argon2PasswordHasher"]
+PASSWORD_HASHERS: list[str] = ["apps.users.hashers.LimitedArgon2PasswordHasher"]
 
 LANGUAGE_CODE = "en-us"
 TIME_ZONE = "UTC"
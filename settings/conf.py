@@ -114,6 +114,16 @@ class Settings:
                 seconds=config("BLOG_JWT_REFRESH_LIFETIME", cast=int)
             )
 
+            # "db" keeps the refresh token blacklist in the token_blacklist
+            # tables, "redis" in Redis until each token expires. To cut over,
+            # run migrate_token_blacklist, switch to "redis" and run it again
+            # for tokens blacklisted in the tables meanwhile
+            token_store = config("BLOG_JWT_TOKEN_STORE", default="db")
+
+            # Tokens whose signature is verified once per process, see
+            # apps.users.authentication
+            validated_cache_size = 10_000
+
             @property
             def private_key(self) -> str:
                 private_key_path: Path = BASE_DIR / config("BLOG_JWT_PRIVATE_KEY_PATH")
@@ -128,6 +138,23 @@ class Settings:
             min_length = 8
             max_length = 128
             min_entropy = 50
+            # Of lowercase, uppercase, digits and other characters
+            min_character_classes = 2
+            # Only this many leading characters are rated by zxcvbn, its cost
+            # grows steeply with length
+            zxcvbn_window = 32
+
+            # Changing the costs rehashes passwords on their next login
+            argon2_time_cost = config("BLOG_ARGON2_TIME_COST", default=2, cast=int)
+            argon2_memory_cost = config(
+                "BLOG_ARGON2_MEMORY_COST", default=102400, cast=int
+            )
+            argon2_parallelism = config("BLOG_ARGON2_PARALLELISM", default=8, cast=int)
+
+            # Password hashes computed at once per process
+            hash_concurrency = config(
+                "BLOG_PASSWORD_HASH_CONCURRENCY", default=4, cast=int
+            )
 
         jwt = JWT()
         password = Password
@@ -135,6 +162,7 @@ class Settings:
     class Post:
         title_max_length = 200
         body_max_length = 5000
+        search_query_max_length = 200
 
     class Log:
         level = config("LOG_LEVEL", default="INFO")
@@ -142,6 +170,10 @@ class Settings:
         debug_allowed = level == "DEBUG"
         info_allowed = level == "INFO"
 
+        # Requests above these are logged as warnings, see middleware.queries
+        query_budget = 20
+        repeated_query_threshold = 5
+
     class Redis:
         @property
         def password(self) -> str:
@@ -155,15 +187,50 @@ class Settings:
             post_list = "post_list"
             comment_list = "comment_list"
             user_list = "user_list"
+            post_detail = "post_detail"
+            user = "user"
+            token_blacklist = "token_blacklist"
 
         prefix = Prefix
 
+        post_detail_timeout = 60 * 5
+        # Users resolved for authenticated requests, see apps.users.cache
+        user_timeout = 60
+        page_timeout = 60
+
+        # Cached pages are served stale for this long while being refreshed
+        page_stale_timeout = 60 * 5
+        page_lock_timeout = 10
+        page_lock_wait_timeout = 2
+        page_refresh_workers = 4
+
+    class Outbox:
+        batch_size = 500
+        poll_interval = 0.5
+        max_retry_delay = 30
+
+        # "stream" also appends every event to a capped Redis Stream
+        transport = config("BLOG_COMMENTS_TRANSPORT", default="pubsub")
+        stream_max_length = 100_000
+
+    class Streams:
+        # Events buffered per open stream before it's dropped as too slow
+        queue_size = 100
+        heartbeat_interval = 15
+
+    class Export:
+        # Rows fetched per server-side cursor round trip
+        chunk_size = 2000
+
     users = Users
     db = Database()
     auth = Auth()
     post = Post
     log = Log
     redis = Redis()
+    outbox = Outbox
+    streams = Streams
+    export = Export
 
 
 settings = Settings()
@@ -179,13 +246,24 @@ SIMPLE_JWT = {
     "BLACKLIST_AFTER_ROTATION": True,
 }
 
+if settings.auth.jwt.token_store == "redis":
+    _serializers = "apps.users.serializers"
+    SIMPLE_JWT |= {
+        "TOKEN_OBTAIN_SERIALIZER": f"{_serializers}.RedisTokenObtainPairSerializer",
+        "TOKEN_REFRESH_SERIALIZER": f"{_serializers}.RedisTokenRefreshSerializer",
+        "TOKEN_VERIFY_SERIALIZER": f"{_serializers}.RedisTokenVerifySerializer",
+    }
+
 CACHES = {
     "default": {
-        "BACKEND": "django_redis.cache.RedisCache",
+        "BACKEND": "common.cache_backends.TwoTierRedisCache",
         "LOCATION": f"redis://{settings.redis.host}:{settings.redis.port}/1",
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
             "PASSWORD": settings.redis.password,
+            "L1_KEY_PREFIXES": ("page.", f"{settings.redis.prefix.post_detail}."),
+            "L1_MAX_ENTRIES": 1000,
+            "L1_TIMEOUT": 5,
         },
     }
 }
@@ -0,0 +1,34 @@
+from rest_framework_simplejwt.views import TokenObtainPairView
+
+from django.urls import path
+
+from apps.comments.views import async_comment_list, stream_comments
+from apps.posts.views import async_post_detail, async_post_list
+from apps.users.hashers import password_executor
+from apps.users.views import RegisterViewSet, async_user_detail
+from common.async_views import offload_view
+
+from . import urls
+
+# Read endpoints with native async implementations, the comment stream and the
+# password hashing endpoints, run off the thread the sync views share.
+# Everything else, and every read the async views can't answer, goes to
+# settings.urls
+urlpatterns = [
+    path("api/posts/", async_post_list),
+    path("api/posts/<slug:slug>/", async_post_detail),
+    path("api/posts/<slug:post_slug>/comments/", async_comment_list),
+    # Never ends, a WSGI worker would be held by it forever
+    path("api/posts/<slug:post_slug>/comments/stream/", stream_comments),
+    path("api/users/<uuid:user_id>/", async_user_detail),
+    path(
+        "api/auth/token/",
+        offload_view(TokenObtainPairView.as_view(), password_executor),
+        name="token_obtain_pair",
+    ),
+    path(
+        "api/auth/register/",
+        offload_view(RegisterViewSet.as_view({"post": "create"}), password_executor),
+    ),
+    *urls.urlpatterns,
+]